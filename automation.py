@@ -6,9 +6,50 @@
 包含run_automation相关的核心自动化流程
 """
 
+import os
 import time
+import itertools
 import logging
-from typing import Optional, Tuple
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from screenshot_pump import HAVE_BETTERCAM, BettercamSource, ScreenshotPump
+
+
+@dataclass(frozen=True)
+class Step:
+    """单个"截图 → 匹配模板 → 点击 → 等待"步骤的描述"""
+    name: str                              # 日志中显示的步骤名称
+    template: str                          # 要点击的模板文件名
+    next_templates: Tuple[str, ...]        # 点击后等待出现的模板
+    timeout: Optional[float] = None        # 等待超时，None表示使用step_timeout
+    unique: bool = False                   # 是否检查匹配歧义（存在相近的次佳匹配时不点击）
+    wait_gone: bool = False                # 等待next_templates消失而不是出现（流程的最后一步）
+
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAVE_WATCHDOG = True
+except Exception as e:
+    HAVE_WATCHDOG = False
+    logging.getLogger(__name__).debug("watchdog不可用: %s", e)
+
+
+# run_automation启动前必须存在的模板
+REQUIRED_TEMPLATES = ("img_filter_icon.png", "img_menu_option.png", "attachment_node.png")
+
+# 网格操作步骤表
+_GRID_CHECK = Step("勾选网格", "grid_check.png", ("grid_check.png",), wait_gone=True)
+_GRID_EDIT = Step("编辑网格", "grid_edit.png", ("grid_draw.png",))
+_GRID_DRAW = Step("描绘", "grid_draw.png", ("draw_sure.png",))
+_DRAW_SURE = Step("确定", "draw_sure.png", ("draw_sure.png",), wait_gone=True)
+# 完整网格操作流程：编辑网格 -> 描绘 -> 确定
+_GRID_STEPS = (_GRID_EDIT, _GRID_DRAW, _DRAW_SURE)
+
+# run_automation依次执行的流程：(流程名称, isImgProcess)
+_WORKFLOWS = (("图片勾选网格", True), ("网格编辑", False))
 
 
 class AutomationRunner:
@@ -29,6 +70,342 @@ class AutomationRunner:
         self.window_manager = window_manager
         self.click_manager = click_manager
         self.logger = logging.getLogger(__name__)
+        
+        # 热路径上频繁使用的配置项快照
+        self._reload_config()
+        
+        # 模板文件名 -> 路径 的缓存，避免每一步都重新拼接路径和stat文件
+        self._tpl: Dict[str, str] = {}
+        # 模板文件修改时间，用于发现同名替换的模板
+        self._tpl_mtime: Dict[str, float] = {}
+        self.refresh_templates()
+        
+        # 截图缓存：每次点击后代数+1，同一代内的查找复用同一张截图
+        self._shot_gen = 0
+        self._shot_cache = {"gen": -1, "img": None, "region": None}
+        # 等待下一步界面时对同一帧的扫描结果 (截图, {模板路径: 位置})，供紧接着的步骤直接使用
+        self._last_scan: Tuple[Any, Dict[str, Optional[Tuple[int, int]]]] = (None, {})
+        self._poll_count = 0
+        # 各组标志模板从点击到出现的实测耗时（指数滑动平均），用于推迟第一次轮询
+        self._wait_ewma: Dict[Tuple[Tuple[str, ...], bool], float] = {}
+        
+        # 可选的后台截图线程，仅在run_automation执行期间运行
+        self._pump: Optional[ScreenshotPump] = None
+        self._capture: Optional[BettercamSource] = None
+        self._last_click_time = float("-inf")
+        self._last_frame_time = float("-inf")
+    
+    def _reload_config(self):
+        """从配置管理器读取热路径使用的配置项"""
+        self._conf_thr = self.config_manager.get("confidence_threshold", 0.8)
+        self._conf_diff_thr = self.config_manager.get("confidence_diff_threshold", 0.05)
+        self._click_delay = self.config_manager.get("click_delay", 5.0)
+        self._op_delay = self.config_manager.get("operation_delay", 2.0)
+        self._debug = self.config_manager.get("debug_mode", False)
+        self._poll_interval = self.config_manager.get("poll_interval", 0.05)
+        self._step_timeout = self.config_manager.get("step_timeout", self._click_delay)
+        self._node_height = self.config_manager.get("node_height", 20)
+        self._nndr_thr = self.config_manager.get("nndr_threshold", 0.8)
+        # 轮询时只截取模板学习区域的并集，每隔几次做一次完整截图（0为关闭）
+        self._full_poll_every = self.config_manager.get("roi_poll_full_every", 4)
+        # 按实测耗时推迟第一次轮询的比例（0为关闭）
+        self._adaptive_wait = self.config_manager.get("adaptive_wait_ratio", 0.5)
+        # 相邻子节点在截图坐标系中的行距（node_height和dpr在运行中很少变化）
+        self._subnode_step = self._node_height * self.click_manager.dpr
+    
+    def reload(self):
+        """配置文件被外部修改后调用，刷新配置快照"""
+        self._reload_config()
+        self.logger.info("自动化流程配置已刷新")
+    
+    def _scan_templates_dir(self) -> Dict[str, Tuple[str, float]]:
+        """扫描模板目录，返回 {文件名: (路径, 修改时间)}"""
+        return {
+            entry.name: (entry.path, entry.stat().st_mtime)
+            for entry in os.scandir(self.template_manager.templates_dir)
+            if entry.is_file()
+        }
+    
+    def refresh_templates(self, entries: Optional[Dict[str, Tuple[str, float]]] = None):
+        """
+        重新扫描模板目录，刷新模板路径缓存
+        
+        Args:
+            entries: 调用方已扫描到的目录内容，为None时重新扫描
+        """
+        if entries is None:
+            entries = self._scan_templates_dir()
+        self._tpl = {name: path for name, (path, _) in entries.items()}
+        self._tpl_mtime = {name: mtime for name, (_, mtime) in entries.items()}
+        self.template_manager.clear_template_cache()
+        self.template_manager.preload_templates(self._tpl.values())
+        self.logger.debug("已缓存 %d 个模板文件", len(self._tpl))
+    
+    def _template_path(self, template_name: str) -> str:
+        """获取模板路径（优先使用缓存）"""
+        path = self._tpl.get(template_name)
+        if path is None:
+            # 缓存中没有时返回原始路径，由find_template负责记录缺失日志
+            path = str(self.template_manager.templates_dir / template_name)
+        return path
+    
+    def _get_screenshot(self, window_region: Optional[Tuple[int, int, int, int]] = None,
+                        force: bool = False, name: Optional[str] = None):
+        """
+        获取截图，上次点击之后界面未被操作过时直接复用缓存的截图
+        
+        Args:
+            window_region: 截图区域
+            force: 是否强制重新截图（轮询界面变化时使用）
+            name: 截图名称（用于调试）
+            
+        Returns:
+            截图的numpy数组或None
+        """
+        cache = self._shot_cache
+        if (not force and cache["img"] is not None
+                and cache["gen"] == self._shot_gen and cache["region"] == window_region):
+            return cache["img"]
+        
+        screenshot = None
+        pump = self._pump
+        if pump is not None and pump.region == window_region:
+            # 只接受上次点击之后开始截取的帧；强制刷新时还要求比上次用过的帧更新
+            newer_than = max(self._last_click_time, self._last_frame_time) if force else self._last_click_time
+            screenshot, frame_time = pump.latest(newer_than)
+            if screenshot is not None:
+                self._last_frame_time = frame_time
+        
+        if screenshot is None:
+            screenshot = self.template_manager.take_screenshot(window_region, name)
+        if screenshot is not None:
+            self._shot_cache = {"gen": self._shot_gen, "img": screenshot, "region": window_region}
+            # 复用截图缓冲区时新旧帧是同一个数组，取到新帧即作废上一帧的扫描结果
+            self._last_scan = (None, {})
+        return screenshot
+    
+    def _click(self, x: int, y: int, window_region: Optional[Tuple[int, int, int, int]] = None,
+               wait: bool = True):
+        """点击指定位置，并使截图缓存失效"""
+        pump = self._pump
+        if pump is not None:
+            pump.pause()
+        try:
+            result = self.click_manager.click_at_position(x, y, window_region, wait=wait)
+        finally:
+            self._shot_gen += 1
+            self._last_click_time = time.monotonic()
+            if pump is not None:
+                pump.resume()
+        return result
+    
+    def _start_pump(self, window_region: Optional[Tuple[int, int, int, int]] = None):
+        """按配置启动后台截图线程"""
+        if not self.config_manager.get("background_screenshot", False):
+            return
+        
+        # 后台线程截图时不能复用缓冲区，否则会覆盖主线程正在匹配的帧
+        grab = lambda region: self.template_manager.take_screenshot(region, reuse_buffer=False)
+        if self.config_manager.get("screenshot_backend", "pyautogui") == "bettercam":
+            if HAVE_BETTERCAM:
+                try:
+                    self._capture = BettercamSource(window_region, self.config_manager.get("capture_fps", 30))
+                    grab = self._capture.grab
+                except Exception as e:
+                    self.logger.warning("bettercam启动失败，使用默认截图方式: %s", e)
+            else:
+                self.logger.warning("未安装bettercam，使用默认截图方式")
+        
+        self._pump = ScreenshotPump(
+            grab, window_region,
+            self.config_manager.get("background_screenshot_interval", 0.0)
+        )
+        self._pump.start()
+        self.logger.info("已启动后台截图线程")
+    
+    def _stop_pump(self):
+        """停止后台截图线程"""
+        if self._pump is not None:
+            self._pump.stop()
+            self._pump = None
+        if self._capture is not None:
+            self._capture.stop()
+            self._capture = None
+    
+    def _wait_until(self, predicate: Callable[[], bool], timeout: float, poll: Optional[float] = None) -> bool:
+        """
+        轮询等待条件成立，条件满足后立即返回
+        
+        Args:
+            predicate: 无参数的判断函数
+            timeout: 最长等待时间(秒)
+            poll: 轮询间隔(秒)，默认使用poll_interval
+            
+        Returns:
+            超时前条件是否成立
+        """
+        if poll is None:
+            poll = self._poll_interval
+        deadline = time.monotonic() + timeout
+        while True:
+            if predicate():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+    
+    def _any_template_visible(self, template_names: Iterable[str],
+                              window_region: Optional[Tuple[int, int, int, int]] = None,
+                              before: Optional[Tuple[int, Tuple[int, ...]]] = None) -> Optional[bool]:
+        """
+        重新截图并检查任一模板是否出现在界面上
+        
+        Args:
+            template_names: 模板文件名列表
+            window_region: 窗口区域
+            before: 点击前截图的签名，给出时只检查与之不同的完整截图
+            
+        Returns:
+            任一模板是否出现；截图与点击前相同（界面尚未响应）时返回None
+        """
+        template_paths = [self._tpl[name] for name in template_names if name in self._tpl]
+        
+        self._poll_count += 1
+        if (before is None and self._full_poll_every > 0
+                and self._poll_count % self._full_poll_every and self._pump is None):
+            visible = self._region_template_visible(template_paths, window_region)
+            if visible is not None:
+                return visible
+        
+        screenshot = self._get_screenshot(window_region, force=True)
+        if screenshot is None:
+            return False
+        if before is not None and self.template_manager.frame_signature(screenshot) == before:
+            return None
+        
+        # 轮询只做一次TM_CCOEFF_NORMED匹配：完整匹配流程中的TM_CCORR_NORMED等方法在纯色背景上
+        # 也有0.93以上的得分，会在目标绘制前就判定为出现
+        matches = {
+            path: position if position is not None and score >= self._conf_thr else None
+            for path, (position, score) in self.template_manager.find_templates_batch(
+                screenshot, template_paths, self._conf_thr).items()
+        }
+        self._last_scan = (screenshot, matches)
+        return any(position is not None for position in matches.values())
+    
+    def _region_template_visible(self, template_paths: List[str],
+                                 window_region: Optional[Tuple[int, int, int, int]] = None) -> Optional[bool]:
+        """
+        只截取模板上次出现位置附近的区域进行检查，截图与匹配的像素量都远小于整个窗口
+        
+        Args:
+            template_paths: 模板路径列表
+            window_region: 窗口区域
+            
+        Returns:
+            任一模板是否出现；没有可用的学习区域时返回None，由调用方完整截图检查
+        """
+        cache = self._shot_cache
+        if cache["img"] is None or cache["region"] != window_region:
+            return None
+        region = self.template_manager.learned_region(template_paths, cache["img"].shape[:2])
+        if region is None:
+            return None
+        
+        x0, y0, x1, y1 = region
+        origin_x, origin_y = window_region[:2] if window_region else (0, 0)
+        # 局部截图不能写入共用缓冲区，否则会覆盖缓存中的完整截图
+        image = self.template_manager.take_screenshot((origin_x + x0, origin_y + y0, x1 - x0, y1 - y0),
+                                                      reuse_buffer=False)
+        if image is None:
+            return None
+        matches = self.template_manager.find_templates_in_region(image, (x0, y0), template_paths, self._conf_thr)
+        # 缓存中的完整截图可能早于界面变化，后续步骤需要重新截图
+        self._shot_cache = {"gen": -1, "img": cache["img"], "region": window_region}
+        self._last_scan = (None, {})
+        return any(position is not None for position in matches.values())
+    
+    def _click_and_wait(self, x: int, y: int, template_names: Iterable[str],
+                        window_region: Optional[Tuple[int, int, int, int]] = None,
+                        timeout: Optional[float] = None, gone: bool = False) -> bool:
+        """
+        点击指定位置并等待下一步界面
+        
+        点击前界面上可能已有下一步的标志模板（如上一个子节点留下的编辑网格按钮），
+        因此等待出现时先记录点击前截图的签名，只接受点击后发生变化的截图
+        
+        Args:
+            x: 点击的x坐标
+            y: 点击的y坐标
+            template_names: 下一步界面的标志模板
+            window_region: 窗口区域
+            timeout: 最长等待时间，默认使用step_timeout
+            gone: 为True时等待这些模板全部消失
+            
+        Returns:
+            是否在超时前检测到下一步界面
+        """
+        before = None
+        if not gone and not self._debug:
+            screenshot = self._get_screenshot(window_region, force=True)
+            if screenshot is not None:
+                before = self.template_manager.frame_signature(screenshot)
+        self._click(x, y, window_region, wait=False)
+        return self._wait_for_next_state(template_names, window_region, timeout, gone, before)
+    
+    def _wait_for_next_state(self, template_names: Iterable[str],
+                             window_region: Optional[Tuple[int, int, int, int]] = None,
+                             timeout: Optional[float] = None, gone: bool = False,
+                             before: Optional[Tuple[int, Tuple[int, ...]]] = None) -> bool:
+        """
+        点击后等待下一步的界面元素出现，代替固定的time.sleep
+        
+        Args:
+            template_names: 下一步界面的标志模板（出现任意一个即可）
+            window_region: 窗口区域
+            timeout: 最长等待时间，默认使用step_timeout
+            gone: 为True时等待这些模板全部消失（用于流程的最后一步）
+            before: 点击前截图的签名，给出时界面发生变化之前的截图不计入结果
+            
+        Returns:
+            是否在超时前检测到下一步界面
+        """
+        if timeout is None:
+            timeout = self._step_timeout
+        
+        # 调试模式下保留固定等待，便于观察每一步的效果
+        if self._debug:
+            time.sleep(timeout)
+            return True
+        
+        template_names = list(template_names)
+        start = time.monotonic()
+        key = (tuple(template_names), gone)
+        expected = self._wait_ewma.get(key)
+        if expected is not None and self._adaptive_wait > 0:
+            # 界面在实测耗时之前几乎不会变化，这段时间不截图，把CPU留给Spine重绘
+            time.sleep(min(expected * self._adaptive_wait, timeout))
+        # 每次等待的第一次轮询使用完整截图
+        self._poll_count = -1
+        reference = [before]
+        
+        def ready() -> bool:
+            visible = self._any_template_visible(template_names, window_region, reference[0])
+            if visible is None:
+                return False
+            # 界面已经响应点击，之后的轮询可以只截取学习区域
+            reference[0] = None
+            return visible != gone
+        
+        if self._wait_until(ready, max(timeout - (time.monotonic() - start), 0.0)):
+            elapsed = time.monotonic() - start
+            self._wait_ewma[key] = elapsed if expected is None else 0.8 * expected + 0.2 * elapsed
+            self.logger.debug("检测到%s %s，耗时 %.2fs", "界面元素消失" if gone else "下一步界面",
+                              template_names, elapsed)
+            return True
+        
+        self.logger.warning("等待%s %s 超时 (%ss)", "界面元素消失" if gone else "下一步界面", template_names, timeout)
+        return False
     
     def run_automation(self):
         """运行自动化流程"""
@@ -50,165 +427,173 @@ class AutomationRunner:
         
         # 查找Spine窗口
         window_region = self.window_manager.find_spine_window()
-        print(window_region)
         if window_region:
-            self.logger.info(f"找到Spine窗口: {window_region}")
+            self.logger.info("找到Spine窗口: %s", window_region)
         else:
             self.logger.info("未找到Spine窗口，将使用全屏操作")
         
-        # 检查必需的模板文件
-        required_templates = [
-            "img_filter_icon.png",
-            "img_menu_option.png", 
-            "attachment_node.png"
-        ]
-        
-        missing_templates = []
-        for template_name in required_templates:
-            template_path = self.template_manager.templates_dir / template_name
-            if not template_path.exists():
-                missing_templates.append(template_name)
+        # 每次运行只做一次scandir：新增、删除或同名替换了模板时刷新模板缓存
+        entries = self._scan_templates_dir()
+        present = entries.keys()
+        if {name: mtime for name, (_, mtime) in entries.items()} != self._tpl_mtime:
+            self.refresh_templates(entries)
+        missing_templates = [name for name in REQUIRED_TEMPLATES if name not in present]
         
         if missing_templates:
-            self.logger.error(f"缺少必需的模板文件: {missing_templates}")
-            self.setup_templates()
-            return
+            self.logger.error("缺少必需的模板文件: %s", missing_templates)
+            # 模板补齐后直接继续本次流程，无需重新启动脚本
+            if not self.setup_templates(missing_templates):
+                return
+        
+        # 恢复上次运行学习到的搜索区域，首次查找即可只搜索局部（留空或null表示不缓存）
+        roi_cache = self.config_manager.get("roi_cache_file", "~/.cache/spine-auto/learned_roi.json")
+        roi_cache = os.path.expanduser(roi_cache) if roi_cache else ""
+        if roi_cache:
+            self.template_manager.load_learned_roi(roi_cache)
         
         # 执行主要流程
+        self._start_pump(window_region)
         try:
-            #图片勾选☑️网格流程
-
-            # 步骤1: 点击筛选图标
-            if not self.click_filter_icon(window_region, isImgProcess=True):
-                self.logger.error("点击筛选图标失败")
-                return
-            
-            # 步骤2: 点击网格菜单选项
-            if not self.click_grid_menu_option(window_region, isImgProcess=True):
-                self.logger.error("点击网格菜单选项失败")
-                return
-            
-            # 步骤3: 点击附件节点
-            attachment_pos = self.click_attachment_node(window_region)
-            if attachment_pos is None:
-                self.logger.error("点击附件节点失败")
-                return
-            
-            # 步骤4: 循环点击附件子节点
-            self.process_attachment_subnodes(attachment_pos, window_region, isImgProcess=True)
-
-            #网格编辑流程
-            # 步骤1: 点击筛选图标
-            if not self.click_filter_icon(window_region, isImgProcess=False):
-                self.logger.error("点击筛选图标失败")
-                return
-            
-            # 步骤2: 点击网格菜单选项
-            if not self.click_grid_menu_option(window_region, isImgProcess=False):
-                self.logger.error("点击网格菜单选项失败")
-                return
-            
-            # 步骤3: 点击附件节点
-            attachment_pos = self.click_attachment_node(window_region)
-            if attachment_pos is None:
-                self.logger.error("点击附件节点失败")
-                return
-            
-            # 步骤4: 循环点击附件子节点
-            self.process_attachment_subnodes(attachment_pos, window_region, isImgProcess=False)            
-
-
+            # 先执行图片勾选☑️网格流程，再执行网格编辑流程；
+            # 第二遍流程沿用第一遍学习到的搜索区域
+            for workflow_name, isImgProcess in _WORKFLOWS:
+                self.logger.info("开始%s流程", workflow_name)
+                if not self._run_workflow(window_region, isImgProcess):
+                    return
             
         except Exception as e:
-            self.logger.error(f"自动化流程执行失败: {e}")
+            self.logger.error("自动化流程执行失败: %s", e)
+        finally:
+            self._stop_pump()
+            if roi_cache:
+                self.template_manager.save_learned_roi(roi_cache)
         
         self.logger.info("自动化流程完成")
     
-    def click_filter_icon(self, window_region: Optional[Tuple[int, int, int, int]] = None, isImgProcess: bool = False) -> bool:
-        """点击筛选图标"""
-        self.logger.info("步骤1: 点击筛选图标")
+    def _run_workflow(self, window_region: Optional[Tuple[int, int, int, int]] = None,
+                      isImgProcess: bool = False) -> bool:
+        """
+        执行一遍完整流程：筛选图标 -> 网格菜单选项 -> 附件节点 -> 附件子节点
+        
+        Args:
+            window_region: 窗口区域
+            isImgProcess: True为图片勾选网格流程，False为网格编辑流程
+            
+        Returns:
+            是否执行到了子节点处理（前三步任一失败时返回False）
+        """
+        # 步骤1: 点击筛选图标
+        if not self.click_filter_icon(window_region, isImgProcess=isImgProcess):
+            self.logger.error("点击筛选图标失败")
+            return False
+        
+        # 步骤2: 点击网格菜单选项
+        if not self.click_grid_menu_option(window_region, isImgProcess=isImgProcess):
+            self.logger.error("点击网格菜单选项失败")
+            return False
+        
+        # 步骤3: 点击附件节点
+        attachment_pos = self.click_attachment_node(window_region)
+        if attachment_pos is None:
+            self.logger.error("点击附件节点失败")
+            return False
         
+        # 步骤4: 循环点击附件子节点
+        self.process_attachment_subnodes(attachment_pos, window_region, isImgProcess=isImgProcess)
+        return True
+    
+    def _run_step(self, step: Step, window_region: Optional[Tuple[int, int, int, int]] = None) -> bool:
+        """
+        执行一个表驱动的点击步骤
+        
+        Args:
+            step: 步骤描述
+            window_region: 窗口区域
+            
+        Returns:
+            是否找到模板并完成点击
+        """
         try:
-            screenshot = self.template_manager.take_screenshot(window_region)
+            screenshot = self._get_screenshot(window_region)
             if screenshot is None:
                 return False
             
-            if isImgProcess:
-                filter_template = str(self.template_manager.templates_dir / "img_filter_icon.png")
+            template_path = self._template_path(step.template)
+            if step.unique:
+                pos = self._find_unique(screenshot, template_path, step, window_region)
             else:
-                filter_template = str(self.template_manager.templates_dir / "grid_filter_icon.png")
-
-            filter_pos = self.template_manager.find_template(
-                screenshot, 
-                filter_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
+                scanned, matches = self._last_scan
+                if scanned is screenshot and template_path in matches:
+                    # 等待阶段已在这一帧上匹配过该模板
+                    pos = matches[template_path]
+                else:
+                    pos = self.template_manager.find_template(screenshot, template_path, self._conf_thr)
             
-            if filter_pos is None:
-                self.logger.warning("未找到筛选图标")
+            if pos is None:
+                self.logger.warning("未找到%s按钮", step.name)
                 return False
             
-            self.logger.info("filter_pos: " + str(filter_pos[0]) + " " + str(filter_pos[1]))
-            
-            # 使用配置中的点击方式
-            self.click_manager.click_at_position(
-                filter_pos[0], filter_pos[1], 
-                window_region
-            )
+            self.logger.debug("%s位置: %d %d", step.name, pos[0], pos[1])
             
-            # 调试模式下额外检查
-            if self.config_manager.get("debug_mode", False):
-                self.logger.info("等待点击效果生效...")
-                time.sleep(1.0)
-                # 可以在这里添加验证点击是否成功的逻辑
-            
-            time.sleep(self.config_manager.get("click_delay", 5.0))
+            # 点击后轮询等待下一步界面出现
+            self._click_and_wait(pos[0], pos[1], step.next_templates, window_region,
+                                 timeout=step.timeout, gone=step.wait_gone)
             return True
             
         except Exception as e:
-            self.logger.error(f"点击筛选图标失败: {e}")
+            self.logger.error("点击%s失败: %s", step.name, e)
             return False
     
+    def _find_unique(self, screenshot, template_path: str, step: Step,
+                     window_region: Optional[Tuple[int, int, int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        查找模板并做比值检验，画面中存在同一模板的相近次佳匹配时不点击
+        
+        属于其他已知模板的峰值（如并排的图片/网格筛选图标）不计入次佳匹配，次佳匹配也须达到置信度阈值
+        才视为歧义。直接匹配未达到阈值时交给完整匹配流程（预处理/多尺度），该路径不做歧义检验
+        
+        Args:
+            screenshot: 屏幕截图
+            template_path: 模板路径
+            step: 步骤描述
+            window_region: 窗口区域
+            
+        Returns:
+            无歧义的匹配位置，或None
+        """
+        pos, best, second = self.template_manager.find_template_peaks(
+            screenshot, template_path, self._conf_thr, self._tpl.values())
+        if pos is None:
+            return self.template_manager.find_template(screenshot, template_path, self._conf_thr)
+        
+        if second < self._conf_thr or second <= best * self._nndr_thr:
+            return pos
+        
+        self.logger.warning("%s匹配有歧义: 最佳 %.3f, 次佳 %.3f", step.name, best, second)
+        return None
+    
+    def click_filter_icon(self, window_region: Optional[Tuple[int, int, int, int]] = None, isImgProcess: bool = False) -> bool:
+        """点击筛选图标"""
+        self.logger.info("步骤1: 点击筛选图标")
+        
+        # 点击后等待下拉菜单出现
+        if isImgProcess:
+            step = Step("筛选图标", "img_filter_icon.png", ("img_menu_option.png",), unique=True)
+        else:
+            step = Step("筛选图标", "grid_filter_icon.png", ("grid_menu_option.png",), unique=True)
+        return self._run_step(step, window_region)
+    
     def click_grid_menu_option(self, window_region: Optional[Tuple[int, int, int, int]] = None, isImgProcess: bool = False) -> bool:
         """点击下拉菜单中的网格选项"""
         self.logger.info("步骤2: 点击网格菜单选项")
         
-        try:
-            # 等待下拉菜单出现
-            time.sleep(0.5)
-            screenshot = self.template_manager.take_screenshot(window_region, "grid_menu_option")
-            if screenshot is None:
-                return False
-            
-            if isImgProcess:
-                grid_menu_template = str(self.template_manager.templates_dir / "img_menu_option.png")
-            else:
-                grid_menu_template = str(self.template_manager.templates_dir / "grid_menu_option.png")
-
-            grid_pos = self.template_manager.find_template(
-                screenshot, 
-                grid_menu_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
-            
-            if grid_pos is None:
-                self.logger.warning("未找到网格菜单选项")
-                return False
-            
-            self.click_manager.click_at_position(
-                grid_pos[0], grid_pos[1], 
-                window_region
-            )
-            
-            if self.config_manager.get("debug_mode", False):
-                self.logger.info("网格菜单点击完成，等待界面更新...")
-                
-            time.sleep(self.config_manager.get("click_delay", 5.0))
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"点击网格菜单选项失败: {e}")
-            return False
+        # 点击后等待附件节点（任意状态）出现
+        next_templates = ("attachment_node.png", "attachment_node_open.png")
+        if isImgProcess:
+            step = Step("网格菜单选项", "img_menu_option.png", next_templates)
+        else:
+            step = Step("网格菜单选项", "grid_menu_option.png", next_templates)
+        return self._run_step(step, window_region)
     
     def detect_attachment_node_state_with_confidence(self, screenshot) -> Tuple[Optional[str], Optional[Tuple[int, int]], float]:
         """
@@ -220,75 +605,43 @@ class AutomationRunner:
         Returns:
             (状态, 位置, 最高置信度) - 状态可能是 'open', 'close', 或 None
         """
-        import cv2
-        import numpy as np
-        
-        confidence_threshold = self.config_manager.get("confidence_threshold", 0.8)
+        confidence_threshold = self._conf_thr
         
         # 准备模板路径
-        open_template_path = str(self.template_manager.templates_dir / "attachment_node_open.png")
-        close_template_path = str(self.template_manager.templates_dir / "attachment_node.png")
-        
-        open_confidence = 0.0
-        close_confidence = 0.0
-        open_pos = None
-        close_pos = None
+        open_template_path = self._template_path("attachment_node_open.png")
+        close_template_path = self._template_path("attachment_node.png")
+        template_paths = [
+            self._tpl[name] for name in ("attachment_node_open.png", "attachment_node.png")
+            if name in self._tpl
+        ]
         
-        # 检测打开状态的置信度
-        try:
-            if self.template_manager.templates_dir.joinpath("attachment_node_open.png").exists():
-                open_template = cv2.imread(open_template_path)
-                if open_template is not None:
-                    result = cv2.matchTemplate(screenshot, open_template, cv2.TM_CCOEFF_NORMED)
-                    _, max_val, _, max_loc = cv2.minMaxLoc(result)
-                    open_confidence = max_val
-                    if max_val >= confidence_threshold:
-                        template_h, template_w = open_template.shape[:2]
-                        open_pos = (max_loc[0] + template_w // 2, max_loc[1] + template_h // 2)
-                        
-        except Exception as e:
-            self.logger.warning(f"检测打开状态失败: {e}")
+        # 在同一张截图上批量匹配打开/关闭两种状态
+        # 两个模板共用回形针图标与背景，关闭状态下打开模板也能达到0.97左右，必须比较两者的置信度
+        matches = self.template_manager.find_templates_batch(screenshot, template_paths, confidence_threshold)
         
-        # 检测关闭状态的置信度
-        try:
-            if self.template_manager.templates_dir.joinpath("attachment_node.png").exists():
-                close_template = cv2.imread(close_template_path)
-                if close_template is not None:
-                    result = cv2.matchTemplate(screenshot, close_template, cv2.TM_CCOEFF_NORMED)
-                    _, max_val, _, max_loc = cv2.minMaxLoc(result)
-                    close_confidence = max_val
-                    if max_val >= confidence_threshold:
-                        template_h, template_w = close_template.shape[:2]
-                        close_pos = (max_loc[0] + template_w // 2, max_loc[1] + template_h // 2)
-                        
-        except Exception as e:
-            self.logger.warning(f"检测关闭状态失败: {e}")
+        open_pos, open_confidence = matches.get(open_template_path, (None, 0.0))
+        close_pos, close_confidence = matches.get(close_template_path, (None, 0.0))
         
         # 记录置信度信息
-        self.logger.info(f"附件节点状态检测 - 打开状态置信度: {open_confidence:.3f}, 关闭状态置信度: {close_confidence:.3f}")
-        
-        # 比较置信度，选择更高的那个
-        confidence_diff_threshold = self.config_manager.get("confidence_diff_threshold", 0.05)  # 置信度差异阈值
-        
-        if open_confidence > close_confidence + confidence_diff_threshold:
-            # 打开状态的置信度明显更高
-            if open_pos is not None:
-                self.logger.info(f"节点状态判定为：打开 (置信度差异: {open_confidence - close_confidence:.3f})")
-                return ('open', open_pos, open_confidence)
-        elif close_confidence > open_confidence + confidence_diff_threshold:
-            # 关闭状态的置信度明显更高
-            if close_pos is not None:
-                self.logger.info(f"节点状态判定为：关闭 (置信度差异: {close_confidence - open_confidence:.3f})")
-                return ('close', close_pos, close_confidence)
-        else:
-            # 置信度差异不大，使用更保守的策略
-            if max(open_confidence, close_confidence) >= confidence_threshold:
-                if open_confidence >= close_confidence and open_pos is not None:
-                    self.logger.info(f"节点状态判定为：打开 (置信度相近，选择打开: {open_confidence:.3f})")
-                    return ('open', open_pos, open_confidence)
-                elif close_pos is not None:
-                    self.logger.info(f"节点状态判定为：关闭 (置信度相近，选择关闭: {close_confidence:.3f})")
-                    return ('close', close_pos, close_confidence)
+        self.logger.info("附件节点状态检测 - 打开状态置信度: %.3f, 关闭状态置信度: %.3f", open_confidence, close_confidence)
+        
+        # 置信度高的状态为候选（相同时优先打开状态）
+        winner, other = sorted(
+            (('open', open_pos, open_confidence), ('close', close_pos, close_confidence)),
+            key=lambda candidate: candidate[2], reverse=True
+        )
+        state, position, confidence = winner
+        state_name = "打开" if state == 'open' else "关闭"
+        
+        if position is not None:
+            if confidence > other[2] + self._conf_diff_thr:
+                # 候选状态的置信度明显更高
+                self.logger.info("节点状态判定为：%s (置信度差异: %.3f)", state_name, confidence - other[2])
+                return winner
+            if confidence >= confidence_threshold:
+                # 置信度差异不大，但候选状态已达到阈值
+                self.logger.info("节点状态判定为：%s (置信度相近，选择%s: %.3f)", state_name, state_name, confidence)
+                return winner
         
         self.logger.warning("无法确定附件节点状态")
         return (None, None, max(open_confidence, close_confidence))
@@ -298,9 +651,8 @@ class AutomationRunner:
         self.logger.info("步骤3: 智能检查并点击附件节点")
         
         try:
-            # 等待界面更新
-            time.sleep(0.5)
-            screenshot = self.template_manager.take_screenshot(window_region)
+            # 附件节点的出现已在click_grid_menu_option中等待
+            screenshot = self._get_screenshot(window_region)
             if screenshot is None:
                 return None
             
@@ -311,20 +663,20 @@ class AutomationRunner:
                 self.logger.warning("未找到附件节点或无法确定状态")
                 return None
             elif state == 'open':
-                self.logger.info(f"附件节点已经是打开状态，无需点击，位置: {position}，置信度: {confidence:.3f}")
+                self.logger.info("附件节点已经是打开状态，无需点击，位置: %s，置信度: %.3f", position, confidence)
                 return position
             else:  # state == 'close'
-                self.logger.info(f"附件节点是关闭状态，点击打开，位置: {position}，置信度: {confidence:.3f}")
-                self.click_manager.click_at_position(position[0], position[1], window_region)
+                self.logger.info("附件节点是关闭状态，点击打开，位置: %s，置信度: %.3f", position, confidence)
+                if self._debug:
+                    self.logger.info("点击附件节点，等待子节点展开...")
                 
-                if self.config_manager.get("debug_mode", False):
-                    self.logger.info("附件节点点击完成，等待子节点展开...")
-                    
-                time.sleep(self.config_manager.get("operation_delay", 2.0))  # 等待子节点展开
+                # 点击后等待子节点展开（节点变为打开状态）
+                self._click_and_wait(position[0], position[1], ["attachment_node_open.png"], window_region,
+                                     timeout=self._op_delay)
                 return position
             
         except Exception as e:
-            self.logger.error(f"智能检查并点击附件节点失败: {e}")
+            self.logger.error("智能检查并点击附件节点失败: %s", e)
             return None
     
     def process_attachment_subnodes(self, attachment_pos: Tuple[int, int], window_region: Optional[Tuple[int, int, int, int]] = None, isImgProcess: bool = False):
@@ -341,211 +693,154 @@ class AutomationRunner:
     def click_subnode(self, attachment_pos: Tuple[int, int], window_region: Optional[Tuple[int, int, int, int]] = None, isImgProcess: bool = False) -> bool:
         """循环点击子节点"""
         try:
-            node_height = self.config_manager.get("node_height", 20)
+            # 循环中不变的量提前绑定到局部变量
+            step = self._subnode_step
+            ax, ay = attachment_pos
+            click_and_wait = self._click_and_wait
+            next_templates = ("grid_check.png",) if isImgProcess else ("grid_edit.png",)
+            # 子节点y坐标序列：图像处理模式下始终点击第一个子节点，网格编辑模式下逐行向下
+            if isImgProcess:
+                ys = itertools.repeat(ay + step)
+            else:
+                ys = itertools.count(ay + step, step)
             success_count = 0
             consecutive_failures = 0  # 连续失败计数器
             i = 0  # 循环计数器
             
             # 循环直到连续2次网格检查失败
             while consecutive_failures < 2:
-                # 计算当前子节点的y坐标
-                if isImgProcess:
-                    current_y = attachment_pos[1] + node_height * self.click_manager.dpr
-                else:
-                    current_y = attachment_pos[1] + (i + 1) * node_height * self.click_manager.dpr
-
-                click_pos = (attachment_pos[0], current_y)
+                current_y = next(ys)
                 
-                self.logger.info(f"点击子节点 {i+1}，坐标: ({click_pos[0]}, {click_pos[1]})")
+                self.logger.debug("点击子节点 %d，坐标: (%s, %s)", i + 1, ax, current_y)
                 
                 try:
-                    # 点击子节点
-                    self.click_manager.click_at_position(click_pos[0], click_pos[1], window_region)
+                    # 点击子节点，等待子节点对应的网格按钮出现
+                    click_and_wait(ax, current_y, next_templates, window_region)
                     success_count += 1
-                    time.sleep(self.config_manager.get("click_delay", 5.0))
                     
-                    self.logger.info(f"开始执行子节点 {i+1} 的网格操作流程 (isImgProcess: {isImgProcess})")
+                    self.logger.debug("开始执行子节点 %d 的网格操作流程 (isImgProcess: %s)", i + 1, isImgProcess)
                     
                     if isImgProcess:
                         # isImgProcess=true: 只执行点击勾选网格
-                        self.logger.info(f"子节点 {i+1}: 执行图像处理模式 - 仅勾选网格")
+                        self.logger.debug("子节点 %d: 执行图像处理模式 - 仅勾选网格", i + 1)
                         grid_check_result = self.click_grid_check(window_region)
                         if grid_check_result:
-                            self.logger.info(f"子节点 {i+1}: 勾选网格成功")
+                            self.logger.debug("子节点 %d: 勾选网格成功", i + 1)
                             consecutive_failures = 0  # 重置连续失败计数器
-                            self.logger.info(f"子节点 {i+1} 的图像处理流程完成")
+                            self.logger.info("子节点 %d 的图像处理流程完成", i + 1)
                         else:
-                            self.logger.warning(f"子节点 {i+1}: 勾选网格失败")
+                            self.logger.warning("子节点 %d: 勾选网格失败", i + 1)
                             consecutive_failures += 1  # 增加连续失败计数
-                            self.logger.info(f"连续失败次数: {consecutive_failures}/2")
+                            self.logger.info("连续失败次数: %d/2", consecutive_failures)
                     else:
                         # isImgProcess=false: 执行完整的网格操作流程
-                        self.logger.info(f"子节点 {i+1}: 执行完整网格操作模式")
-                        # 2. 点击编辑网格
-                        if self.click_grid_edit(window_region):
-                            self.logger.info(f"子节点 {i+1}: 编辑网格成功")
-                            
-                            # 3. 点击描绘
-                            if self.click_grid_draw(window_region):
-                                self.logger.info(f"子节点 {i+1}: 描绘成功")
-                                
-                                # 4. 点击确定
-                                if self.click_draw_sure(window_region):
-                                    self.logger.info(f"子节点 {i+1}: 确定成功")
-                                    self.logger.info(f"子节点 {i+1} 的完整网格操作流程完成")
-                                else:
-                                    self.logger.warning(f"子节点 {i+1}: 确定失败，流程中断")
-                            else:
-                                self.logger.warning(f"子节点 {i+1}: 描绘失败，流程中断")
+                        self.logger.debug("子节点 %d: 执行完整网格操作模式", i + 1)
+                        for n, grid_step in enumerate(_GRID_STEPS):
+                            self.logger.debug("执行操作: 点击%s", grid_step.name)
+                            if not self._run_step(grid_step, window_region):
+                                self.logger.warning("子节点 %d: %s失败，流程中断", i + 1, grid_step.name)
+                                # 只有第一步（编辑网格）失败才计入连续失败
+                                if n == 0:
+                                    consecutive_failures += 1  # 增加连续失败计数
+                                    self.logger.info("连续失败次数: %d/2", consecutive_failures)
+                                break
+                            self.logger.debug("子节点 %d: %s成功", i + 1, grid_step.name)
                         else:
-                            self.logger.warning(f"子节点 {i+1}: 编辑网格失败，流程中断")
-                            consecutive_failures += 1  # 增加连续失败计数
-                            self.logger.info(f"连续失败次数: {consecutive_failures}/2")
+                            self.logger.info("子节点 %d 的完整网格操作流程完成", i + 1)
                     
                 except Exception as e:
-                    self.logger.warning(f"点击子节点 {i+1} 失败: {e}")
+                    self.logger.warning("点击子节点 %d 失败: %s", i + 1, e)
                     consecutive_failures += 1  # 异常也算作失败
-                    self.logger.info(f"连续失败次数: {consecutive_failures}/2")
+                    self.logger.info("连续失败次数: %d/2", consecutive_failures)
                 
                 i += 1  # 增加循环计数器
             
-            self.logger.info(f"子节点点击完成，总共尝试 {i} 次，成功 {success_count} 次，因连续2次网格检查失败而终止")
+            self.logger.info("子节点点击完成，总共尝试 %d 次，成功 %d 次，因连续2次网格检查失败而终止", i, success_count)
             return success_count > 0
             
         except Exception as e:
-            self.logger.error(f"点击子节点失败: {e}")
+            self.logger.error("点击子节点失败: %s", e)
             return False
     
     def click_grid_check(self, window_region: Optional[Tuple[int, int, int, int]] = None) -> bool:
         """点击勾选网格"""
-        self.logger.info("执行操作: 点击勾选网格")
-        
-        try:
-            screenshot = self.template_manager.take_screenshot(window_region)
-            if screenshot is None:
-                return False
-            
-            grid_check_template = str(self.template_manager.templates_dir / "grid_check.png")
-            grid_check_pos = self.template_manager.find_template(
-                screenshot, 
-                grid_check_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
-            
-            if grid_check_pos is None:
-                self.logger.warning("未找到勾选网格按钮")
-                return False
-            
-            self.click_manager.click_at_position(
-                grid_check_pos[0], grid_check_pos[1], 
-                window_region
-            )
-            
-            time.sleep(self.config_manager.get("click_delay", 5.0))
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"点击勾选网格失败: {e}")
-            return False
+        self.logger.debug("执行操作: 点击勾选网格")
+        return self._run_step(_GRID_CHECK, window_region)
     
     def click_grid_edit(self, window_region: Optional[Tuple[int, int, int, int]] = None) -> bool:
         """点击编辑网格"""
-        self.logger.info("执行操作: 点击编辑网格")
-        
-        try:
-            screenshot = self.template_manager.take_screenshot(window_region)
-            if screenshot is None:
-                return False
-            
-            grid_edit_template = str(self.template_manager.templates_dir / "grid_edit.png")
-            grid_edit_pos = self.template_manager.find_template(
-                screenshot, 
-                grid_edit_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
-            
-            if grid_edit_pos is None:
-                self.logger.warning("未找到编辑网格按钮")
-                return False
-            
-            self.click_manager.click_at_position(
-                grid_edit_pos[0], grid_edit_pos[1], 
-                window_region
-            )
-            
-            time.sleep(self.config_manager.get("click_delay", 5.0))
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"点击编辑网格失败: {e}")
-            return False
+        self.logger.debug("执行操作: 点击编辑网格")
+        return self._run_step(_GRID_EDIT, window_region)
     
     def click_grid_draw(self, window_region: Optional[Tuple[int, int, int, int]] = None) -> bool:
         """点击描绘按钮"""
-        self.logger.info("执行操作: 点击描绘")
-        
-        try:
-            screenshot = self.template_manager.take_screenshot(window_region)
-            if screenshot is None:
-                return False
-            
-            grid_draw_template = str(self.template_manager.templates_dir / "grid_draw.png")
-            grid_draw_pos = self.template_manager.find_template(
-                screenshot, 
-                grid_draw_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
-            
-            if grid_draw_pos is None:
-                self.logger.warning("未找到描绘按钮")
-                return False
-            
-            self.click_manager.click_at_position(
-                grid_draw_pos[0], grid_draw_pos[1], 
-                window_region
-            )
-            
-            time.sleep(self.config_manager.get("click_delay", 5.0))
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"点击描绘失败: {e}")
-            return False
+        self.logger.debug("执行操作: 点击描绘")
+        return self._run_step(_GRID_DRAW, window_region)
     
     def click_draw_sure(self, window_region: Optional[Tuple[int, int, int, int]] = None) -> bool:
         """点击确定按钮"""
-        self.logger.info("执行操作: 点击确定")
+        self.logger.debug("执行操作: 点击确定")
+        return self._run_step(_DRAW_SURE, window_region)
+
+    def _wait_for_template_files(self, template_names: Iterable[str], timeout: float) -> bool:
+        """
+        监听模板目录，直到所有指定模板文件出现
         
-        try:
-            screenshot = self.template_manager.take_screenshot(window_region)
-            if screenshot is None:
-                return False
-            
-            draw_sure_template = str(self.template_manager.templates_dir / "draw_sure.png")
-            draw_sure_pos = self.template_manager.find_template(
-                screenshot, 
-                draw_sure_template, 
-                self.config_manager.get("confidence_threshold", 0.8)
-            )
-            
-            if draw_sure_pos is None:
-                self.logger.warning("未找到确定按钮")
-                return False
+        Args:
+            template_names: 等待的模板文件名
+            timeout: 超时时间（秒）
             
-            self.click_manager.click_at_position(
-                draw_sure_pos[0], draw_sure_pos[1], 
-                window_region
-            )
+        Returns:
+            超时前模板是否全部就绪
+        """
+        templates_dir = self.template_manager.templates_dir
+        remaining = {name for name in template_names if not (templates_dir / name).is_file()}
+        done = threading.Event()
+        lock = threading.Lock()
+        
+        def mark(path: str):
+            with lock:
+                remaining.discard(os.path.basename(path))
+                if not remaining:
+                    done.set()
+        
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                mark(event.src_path)
             
-            time.sleep(self.config_manager.get("click_delay", 5.0))
+            def on_moved(self, event):
+                # 很多截图工具先写临时文件再重命名
+                mark(event.dest_path)
+        
+        if not remaining:
             return True
+        
+        observer = Observer()
+        observer.schedule(_Handler(), str(templates_dir), recursive=False)
+        observer.start()
+        try:
+            # 启动监听前可能已经保存了文件，再检查一次
+            for name in list(remaining):
+                if (templates_dir / name).is_file():
+                    mark(name)
+            return done.wait(timeout)
+        finally:
+            observer.stop()
+            observer.join()
+    
+    def setup_templates(self, missing_templates: Optional[Iterable[str]] = None) -> bool:
+        """
+        设置模板图片（需要用户手动截图）
+        
+        从菜单进入时等待用户按回车（用户可能要替换已有的模板）；运行前发现缺少模板时，
+        安装了watchdog则监听模板目录，缺少的模板全部保存后立即返回，否则等待用户按回车
+        
+        Args:
+            missing_templates: 缺少的模板文件名，None表示从菜单进入
             
-        except Exception as e:
-            self.logger.error(f"点击确定失败: {e}")
-            return False
-
-    def setup_templates(self):
-        """设置模板图片（需要用户手动截图）"""
+        Returns:
+            必需模板是否已全部就绪
+        """
         print("\n=== 模板设置向导 ===")
         print("请按照提示手动截取模板图片并保存到templates文件夹中")
         print(f"模板保存路径: {self.template_manager.templates_dir.absolute()}")
@@ -554,6 +849,20 @@ class AutomationRunner:
         print("2. img_menu_option.png - 下拉菜单中'网格'选项的截图")
         print("3. attachment_node.png - '附件'节点的截图")
         
+        if missing_templates is not None:
+            templates_dir = self.template_manager.templates_dir
+            missing_templates = [name for name in missing_templates if not (templates_dir / name).is_file()]
+        
+        if missing_templates is not None and HAVE_WATCHDOG:
+            if missing_templates:
+                timeout = self.config_manager.get("template_wait_timeout", 600)
+                print(f"\n正在等待模板文件保存（最长 {timeout} 秒）: {', '.join(missing_templates)}")
+                if not self._wait_for_template_files(missing_templates, timeout):
+                    self.logger.warning("等待模板文件超时")
+        else:
+            print("\n请手动创建这些模板文件后，按回车继续...")
+            input()
         
-        print("\n请手动创建这些模板文件后，按回车继续...")
-        input()
\ No newline at end of file
+        # 用户可能新增或替换了模板文件，重新扫描
+        self.refresh_templates()
+        return all(name in self._tpl for name in REQUIRED_TEMPLATES)
@@ -6,6 +6,8 @@
 处理点击操作、坐标转换和DPR检测
 """
 
+import cv2
+import numpy as np
 import pyautogui
 import time
 import logging
@@ -35,6 +37,9 @@ class ClickManager:
         else:
             self.dpr = self.detect_display_scaling()
             self.logger.info(f"自动检测到显示器缩放比例: {self.dpr}")
+        
+        # 上次确认Spine窗口激活的时间（time.monotonic），有效期内的点击不再调用osascript
+        self._activated_at = float("-inf")
     
     def detect_display_scaling(self) -> float:
         """
@@ -88,7 +93,6 @@ except Exception as e:
                 ], capture_output=True, text=True, timeout=10)
                 
                 if result.returncode == 0:
-                    import json
                     display_data = json.loads(result.stdout)
                     
                     # 查找主显示器的分辨率信息
@@ -168,7 +172,8 @@ except Exception as e:
             self.logger.error(f"检测显示器缩放比例失败: {e}")
             return 1.0
     
-    def click_at_position(self, x: int, y: int, window_region: Optional[Tuple[int, int, int, int]] = None):
+    def click_at_position(self, x: int, y: int, window_region: Optional[Tuple[int, int, int, int]] = None,
+                          wait: bool = True):
         """
         在指定位置点击，自动处理DPR缩放
         
@@ -176,13 +181,14 @@ except Exception as e:
             x: 相对于截图区域的x坐标（模板匹配返回的坐标）
             y: 相对于截图区域的y坐标（模板匹配返回的坐标）
             window_region: 窗口区域，用于坐标转换
+            wait: 点击后是否固定等待click_delay（调用方自行轮询界面变化时传False）
         """
         try:
             # 应用DPR修正 - 模板匹配在高分辨率图像上找到的坐标需要除以DPR
             corrected_x = x / self.dpr
             corrected_y = y / self.dpr
             
-            self.logger.debug(f"DPR修正: 原始坐标({x}, {y}) -> 修正坐标({corrected_x:.1f}, {corrected_y:.1f}), DPR={self.dpr}")
+            self.logger.debug("DPR修正: 原始坐标(%s, %s) -> 修正坐标(%.1f, %.1f), DPR=%s", x, y, corrected_x, corrected_y, self.dpr)
 
             # 如果有窗口区域信息，需要转换坐标
             if window_region:
@@ -199,7 +205,7 @@ except Exception as e:
             click_x = int(round(click_x))
             click_y = int(round(click_y))
             
-            self.logger.info(f"准备点击位置: ({click_x}, {click_y}) [DPR修正后]")
+            self.logger.debug("准备点击位置: (%d, %d) [DPR修正后]", click_x, click_y)
             
             # 确保Spine窗口处于活动状态
             self._ensure_spine_window_active()
@@ -208,11 +214,14 @@ except Exception as e:
             success = self._enhanced_click(click_x, click_y)
             
             if success:
-                self.logger.info(f"点击成功: ({click_x}, {click_y})")
-                time.sleep(self.config_manager.get("click_delay", 5.0))
+                self.logger.debug("点击成功: (%d, %d)", click_x, click_y)
+                if wait:
+                    time.sleep(self.config_manager.get("click_delay", 5.0))
                 return [click_x, click_y]
             else:
                 self.logger.error(f"点击失败: ({click_x}, {click_y})")
+                # 点击失败可能是窗口失去焦点，下次点击前重新激活
+                self._activated_at = float("-inf")
                 return None
             
         except Exception as e:
@@ -220,7 +229,9 @@ except Exception as e:
             return None
     
     def _ensure_spine_window_active(self):
-        """确保Spine窗口处于活动状态"""
+        """确保Spine窗口处于活动状态（激活成功后activate_ttl秒内直接跳过）"""
+        if time.monotonic() - self._activated_at < self.config_manager.get("activate_ttl", 5.0):
+            return
         try:
             app_name = self.config_manager.get("app_name", "Spine")
             
@@ -241,7 +252,8 @@ except Exception as e:
                                    capture_output=True, text=True, timeout=3)
             
             if result.returncode == 0 and "success" in result.stdout:
-                self.logger.debug(f"{app_name}窗口已激活")
+                self.logger.debug("%s窗口已激活", app_name)
+                self._activated_at = time.monotonic()
             else:
                 self.logger.warning(f"窗口激活可能失败: {result.stdout}")
                 
@@ -268,7 +280,7 @@ except Exception as e:
         
         for strategy_name, strategy_func in strategies:
             try:
-                self.logger.info(f"尝试{strategy_name}: ({x}, {y})")
+                self.logger.debug("尝试%s: (%s, %s)", strategy_name, x, y)
                 
                 # 移动鼠标到目标位置
                 pyautogui.moveTo(x, y, duration=0.2)
@@ -278,7 +290,7 @@ except Exception as e:
                 success = strategy_func(x, y)
                 
                 if success:
-                    self.logger.info(f"{strategy_name}成功")
+                    self.logger.debug("%s成功", strategy_name)
                     return True
                 else:
                     self.logger.warning(f"{strategy_name}失败，尝试下一种方法")
@@ -361,12 +373,11 @@ except Exception as e:
             after_screenshot = pyautogui.screenshot()
             
             # 简单的像素差异检测
-            import numpy as np
             before_array = np.array(before_screenshot)
             after_array = np.array(after_screenshot)
             
-            # 计算差异
-            diff = np.sum(np.abs(before_array.astype(int) - after_array.astype(int)))
+            # 计算差异（L1范数一次完成，不生成整帧的int64中间数组）
+            diff = cv2.norm(before_array, after_array, cv2.NORM_L1)
             total_pixels = before_array.shape[0] * before_array.shape[1] * before_array.shape[2]
             diff_ratio = diff / (total_pixels * 255)
             
@@ -47,16 +47,49 @@ class ConfigManager:
         self.config = {
             "window_title": "Spine",  # Spine窗口标题关键词
             "app_name": None,  # 应用程序名称，None时自动检测
+            "activate_ttl": 5.0,  # 激活窗口成功后该时间内的点击不再重复激活（秒，0为每次点击都激活）
             "click_delay": 5.0,  # 点击间隔(秒)
             "operation_delay": 2.0,  # 操作完成等待时间(秒)
             "confidence_threshold": 0.8,  # 图像匹配置信度
+            "poll_interval": 0.05,  # 等待界面变化时的截图轮询间隔（秒）
+            "step_timeout": 5.0,  # 每一步等待界面变化的最长时间（秒）
+            "adaptive_wait_ratio": 0.5,  # 按该步骤以往实测耗时的比例推迟第一次轮询（0为每次点击后立即轮询）
             "max_retries": 3,  # 最大重试次数
+            "nndr_threshold": 0.8,  # 次佳/最佳匹配置信度之比超过该值时视为有歧义
+            "template_wait_timeout": 600,  # 模板设置向导等待模板文件保存的超时时间（秒，需安装watchdog）
             "debug_mode": True,  # 调试模式，显示详细信息
-            "matching_algorithm": "enhanced",  # 匹配算法: "basic", "multi_method", "enhanced"
+            "matching_algorithm": "enhanced",  # 匹配算法: "basic", "sqdiff", "multi_method", "enhanced", "orb", "prefilter"
+            "prefilter_stride": 4,  # prefilter匹配时候选窗口的步长（像素）
+            "prefilter_candidates": 16,  # prefilter匹配时做NCC确认的候选窗口数量
+            "orb_features": 5000,  # ORB匹配时每张图最多提取的特征点数（过少时小图标区域可能提取不到特征点）
+            "orb_min_matches": 5,  # ORB有效匹配少于该数量时回退到模板匹配
+            "orb_max_distance": 40,  # ORB描述子汉明距离小于该值才算有效匹配
             "enable_multi_scale": True,  # 启用多尺度匹配
             "enable_preprocessing": True,  # 启用图像预处理
             "scale_range": [0.8, 1.2],  # 缩放范围
             "adaptive_confidence": True,  # 自适应置信度调整
+            "grayscale_matching": False,  # 转为灰度后再匹配（更快，但分数高于彩色匹配，开启后需重新调整置信度阈值）
+            "use_pyramid_search": True,  # 大尺寸截图先在缩小的金字塔图像上粗定位，再全分辨率精匹配
+            "pyramid_min_height": 1080,  # 截图高度超过该值时先做金字塔粗匹配
+            "pyramid_levels": 2,  # 金字塔层数（每层缩小一半）
+            "use_opencl": True,  # OpenCL可用时使用UMat加速模板匹配
+            "use_cuda": True,  # OpenCV支持CUDA且有可用GPU时，批量匹配在GPU上执行
+            "parallel_matching": True,  # 批量匹配多个模板时使用线程池并行
+            "prenormalized_matching": True,  # 批量匹配时共用截图积分图，用去均值模板做TM_CCORR后归一化（需安装numba）
+            "fft_batch_matching": False,  # 批量匹配时在频域中共用截图的DFT（模板较多时更快）
+            "roi_hints": {},  # 模板搜索区域提示 {"模板文件名": [x, y, w, h]}，取值为相对截图的比例
+            "learn_roi": True,  # 首次命中后只在命中位置附近搜索，未命中时回退全图
+            "roi_learn_margin": 2.0,  # 学习区域在模板四周各扩展的模板尺寸倍数
+            "roi_poll_full_every": 4,  # 等待界面变化时只截取学习区域，每隔几次轮询做一次完整截图（0为始终完整截图）
+            "roi_cache_file": "~/.cache/spine-auto/learned_roi.json",  # 学习到的搜索区域在多次运行间的缓存文件（留空或null不保存）
+            "position_memo": True,  # 匹配框内像素未变化时复用上次的匹配位置
+            "frame_result_cache": True,  # 整帧截图与上一帧完全相同时复用上一帧的查找结果（包括未找到）
+            "roi_result_cache": True,  # 学习区域内像素未变化时复用上次的批量匹配结果
+            "reuse_screenshot_buffer": False,  # 截图写入同一块缓冲区（上一帧会被覆盖）
+            "background_screenshot": False,  # 是否在后台线程中持续截图，与模板匹配重叠执行
+            "background_screenshot_interval": 0.0,  # 后台截图的最小间隔（秒）
+            "screenshot_backend": "pyautogui",  # 截图方式: "pyautogui"、"mss"、"dxcam"（仅Windows），或后台截图专用的"bettercam"（仅Windows）
+            "capture_fps": 30,  # bettercam采集帧率
             "tree_region": {  # 树区域 (x, y, width, height)
                 "x": 0,
                 "y": 0, 
@@ -43,6 +43,7 @@ def main():
             print(f"请编辑配置文件: {automation.config_manager.config_path}")
             input("编辑完成后按回车继续...")
             automation.config_manager.load_config()
+            automation.automation_runner.reload()
         elif choice == "4":
             automation.test_click_functionality()
         elif choice == "5":
@@ -107,6 +108,7 @@ def main():
                         new_dpr = float(manual_dpr)
                         if 0.5 <= new_dpr <= 4.0:
                             automation.click_manager.dpr = new_dpr
+                            automation.automation_runner.reload()
                             automation.config_manager.config["manual_dpr"] = new_dpr
                             automation.config_manager.save_config()
                             print(f"✅ DPR已手动设置为: {new_dpr}")
@@ -126,7 +128,6 @@ def main():
             input("准备好后按回车...")
             
             # 获取当前鼠标位置
-            import pyautogui
             test_x, test_y = pyautogui.position()
             print(f"将测试位置: ({test_x}, {test_y})")
             
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+归一化互相关（NCC）加速模块
+
+频域/预归一化匹配得到的互相关结果需要按窗口方差归一化为TM_CCOEFF_NORMED，
+这里用Numba JIT在一次遍历中完成窗口方差计算与除法。
+导入时不编译，启用相关匹配方式时由调用方在主线程中调用warmup()。
+未安装numba时HAVE_NUMBA为False，调用方应回退到OpenCV。
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except Exception as e:
+    HAVE_NUMBA = False
+    logging.getLogger(__name__).debug("numba不可用: %s", e)
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _normalize_kernel(numerator, sq_sum, sums, th, tw, template_norm, out):
+        """
+        用积分图计算窗口方差，并将互相关结果归一化为TM_CCOEFF_NORMED
+
+        Args:
+            numerator: 去均值模板与截图的互相关 (rh, rw)
+            sq_sum: 截图各通道平方和的积分图 (H + 1, W + 1)
+            sums: 截图各通道的积分图 (C, H + 1, W + 1)
+            th: 模板高
+            tw: 模板宽
+            template_norm: 去均值模板的平方和
+            out: 输出结果 (rh, rw) float32
+        """
+        rows, cols = out.shape
+        n = th * tw
+        eps = 1e-6 * max(template_norm, 1.0)
+        for y in prange(rows):
+            for x in range(cols):
+                var = sq_sum[y + th, x + tw] - sq_sum[y, x + tw] - sq_sum[y + th, x] + sq_sum[y, x]
+                for ch in range(sums.shape[0]):
+                    s = sums[ch, y + th, x + tw] - sums[ch, y, x + tw] - sums[ch, y + th, x] + sums[ch, y, x]
+                    var -= s * s / n
+                denom = np.sqrt(max(var, 0.0) * template_norm)
+                if denom > eps:
+                    # 与OpenCV一致：结果限制在[-1, 1]
+                    out[y, x] = min(1.0, max(-1.0, numerator[y, x] / denom))
+                else:
+                    # 纯色窗口（方差为0）记为0
+                    out[y, x] = 0.0
+
+
+# 并行内核不能被多个线程同时调用（workqueue线程层不支持并发）
+_kernel_lock = threading.Lock()
+
+
+def warmup():
+    """
+    编译归一化内核并启动Numba并行运行时
+
+    必须在主线程中调用：并行运行时（如TBB）在工作线程中首次启动时，进程退出会挂起
+    """
+    if HAVE_NUMBA:
+        # 预归一化匹配传入连续数组，频域匹配传入裁剪后的视图，两种内存布局各编译一次
+        for numerator in (np.zeros((5, 5), np.float32), np.zeros((8, 8), np.float32)[:5, :5]):
+            normalize_ccoeff(numerator, np.zeros((9, 9)), np.zeros((1, 9, 9)), 4, 4, 1.0)
+
+
+def normalize_ccoeff(numerator: np.ndarray, sq_sum: np.ndarray, sums: np.ndarray,
+                     th: int, tw: int, template_norm: float) -> np.ndarray:
+    """
+    将频域互相关结果归一化为TM_CCOEFF_NORMED（窗口方差计算与除法在一次遍历中完成）
+
+    Args:
+        numerator: 去均值模板与截图的互相关
+        sq_sum: 截图各通道平方和的积分图
+        sums: 截图各通道的积分图，形状 (C, H + 1, W + 1)
+        th: 模板高
+        tw: 模板宽
+        template_norm: 去均值模板的平方和
+
+    Returns:
+        匹配结果矩阵
+    """
+    if not HAVE_NUMBA:
+        raise RuntimeError("numba未安装，无法使用归一化加速")
+
+    out = np.empty(numerator.shape, np.float32)
+    with _kernel_lock:
+        _normalize_kernel(numerator, sq_sum, sums, th, tw, float(template_norm), out)
+    return out
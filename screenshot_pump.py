@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台截图模块
+
+在后台线程中持续截图，使截图耗时与模板匹配计算重叠
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+try:
+    import bettercam
+    HAVE_BETTERCAM = True
+except Exception as e:
+    HAVE_BETTERCAM = False
+    logging.getLogger(__name__).debug("bettercam不可用: %s", e)
+
+
+class BettercamSource:
+    """bettercam（Windows DXGI）视频模式截图源：由bettercam自身的线程持续采集，取最新一帧不阻塞"""
+
+    def __init__(self, region: Optional[Tuple[int, int, int, int]] = None, target_fps: int = 30):
+        """
+        初始化并启动采集
+
+        Args:
+            region: 截图区域 (x, y, width, height)，None为全屏
+            target_fps: 采集帧率
+        """
+        if not HAVE_BETTERCAM:
+            raise RuntimeError("bettercam未安装")
+        self._camera = bettercam.create(output_color="BGR")
+        # bettercam的区域格式为 (left, top, right, bottom)
+        ltrb = None if region is None else (region[0], region[1], region[0] + region[2], region[1] + region[3])
+        self._camera.start(target_fps=target_fps, region=ltrb, video_mode=True)
+
+    def grab(self, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        """返回最新一帧的副本（区域在启动时已确定）"""
+        frame = self._camera.get_latest_frame()
+        return None if frame is None else np.array(frame)
+
+    def stop(self):
+        """停止采集"""
+        self._camera.stop()
+
+
+class ScreenshotPump(threading.Thread):
+    """后台截图线程：持续截取指定区域，主流程读取最新的一帧"""
+
+    def __init__(self, grab: Callable[[Optional[Tuple[int, int, int, int]]], Optional[np.ndarray]],
+                 region: Optional[Tuple[int, int, int, int]] = None, interval: float = 0.0):
+        """
+        初始化后台截图线程
+
+        Args:
+            grab: 截图函数，接收截图区域，返回截图的numpy数组或None
+            region: 截图区域 (x, y, width, height)
+            interval: 两次截图之间的最小间隔（秒）
+        """
+        super().__init__(name="screenshot-pump", daemon=True)
+        self.logger = logging.getLogger(__name__)
+        self.region = region
+        self._grab = grab
+        self._interval = interval
+
+        # 前台帧及其开始截图的时间，后台线程截完一帧后整体替换
+        self._front: Optional[np.ndarray] = None
+        self._front_time = float("-inf")
+        self._cond = threading.Condition()
+
+        self._running = threading.Event()
+        self._stopped = threading.Event()
+        self._running.set()
+
+    def run(self):
+        """截图循环"""
+        while not self._stopped.is_set():
+            # 点击期间暂停截图，避免截到点击过程中的画面浪费CPU
+            self._running.wait()
+            if self._stopped.is_set():
+                break
+
+            started = time.monotonic()
+            try:
+                back = self._grab(self.region)
+            except Exception as e:
+                self.logger.warning(f"后台截图失败: {e}")
+                # 截图持续失败时避免空转刷屏
+                self._stopped.wait(0.5)
+                continue
+
+            if back is not None:
+                with self._cond:
+                    self._front, self._front_time = back, started
+                    self._cond.notify_all()
+
+            if self._interval > 0:
+                self._stopped.wait(self._interval)
+
+    def latest(self, newer_than: float = float("-inf"), timeout: float = 1.0) -> Tuple[Optional[np.ndarray], float]:
+        """
+        获取最新一帧截图
+
+        Args:
+            newer_than: 只接受在该时刻（time.monotonic）之后开始截取的帧
+            timeout: 等待新帧的超时时间（秒）
+
+        Returns:
+            (截图或None, 该帧开始截图的时间)
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._front_time > newer_than, timeout):
+                return (None, self._front_time)
+            return (self._front, self._front_time)
+
+    def pause(self):
+        """暂停截图（点击前调用）"""
+        self._running.clear()
+
+    def resume(self):
+        """恢复截图"""
+        self._running.set()
+
+    def stop(self):
+        """停止截图线程"""
+        self._stopped.set()
+        self._running.set()
+        if self.is_alive():
+            self.join(timeout=2.0)
@@ -9,11 +9,38 @@
 import cv2
 import numpy as np
 import os
+import json
 import logging
 import datetime
+import threading
+import zlib
 import pyautogui
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterable
+
+from ncc_kernel import HAVE_NUMBA, normalize_ccoeff, warmup as warmup_ncc_kernel
+
+try:
+    import mss
+    HAVE_MSS = True
+except Exception as e:
+    HAVE_MSS = False
+    logging.getLogger(__name__).debug("mss不可用: %s", e)
+
+try:
+    import dxcam
+    HAVE_DXCAM = True
+except Exception as e:
+    HAVE_DXCAM = False
+    logging.getLogger(__name__).debug("dxcam不可用: %s", e)
+
+try:
+    import xxhash
+    HAVE_XXHASH = True
+except Exception as e:
+    HAVE_XXHASH = False
+    logging.getLogger(__name__).debug("xxhash不可用: %s", e)
 
 
 class TemplateManager:
@@ -30,26 +57,351 @@ class TemplateManager:
         self.logger = logging.getLogger(__name__)
         self.templates_dir = Path("templates")
         self.templates_dir.mkdir(exist_ok=True)
+        
+        # 已解码的模板图片缓存（路径 -> 图像），避免每次匹配都重新读盘解码PNG
+        self._tpl_img: Dict[str, np.ndarray] = {}
+        # 已确认不存在的模板路径，避免每次查找都访问文件系统并重复告警（模板目录刷新时清空）
+        self._tpl_missing: set = set()
+        # 模板的派生形式缓存：预处理结果（灰度/模糊/均衡/边缘）与多尺度缩放结果
+        self._tpl_proc: Dict[str, Tuple[np.ndarray, ...]] = {}
+        self._tpl_scaled: Dict[Tuple[str, float, int], np.ndarray] = {}
+        self._tpl_pyr: Dict[Tuple[str, int, int], np.ndarray] = {}
+        # 频域匹配：模板频谱按DFT尺寸缓存
+        self._tpl_fft: Dict[Tuple[str, Tuple[int, int], int], Tuple[list, float]] = {}
+        # 预归一化匹配：去均值模板及其平方和
+        self._tpl_zero_mean: Dict[Tuple[str, int], Tuple[np.ndarray, float]] = {}
+        # 截图的积分图/频谱按帧、按搜索区域缓存，供同一帧上的多个模板共用
+        self._frame_src: Optional[np.ndarray] = None
+        self._frame_cache: Dict[Tuple[int, int, int, int], Dict[str, Any]] = {}
+        self._frame_lock = threading.Lock()
+        # 截图金字塔按(数据地址, 形状, 步长, 层数)缓存，同一帧上的多个模板只缩小一次
+        self._screen_pyramid: Dict[Tuple[int, Tuple[int, ...], Tuple[int, ...], int], Tuple[np.ndarray, np.ndarray]] = {}
+        # ORB特征匹配：模板特征按路径缓存，截图特征按帧缓存（键同截图金字塔）
+        self._orb = None
+        self._tpl_orb: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        self._screen_orb: Dict[Tuple[int, Tuple[int, ...], Tuple[int, ...]], Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = {}
+        # 灰度匹配：模板与截图都转为单通道，相关计算量约为BGR的1/3
+        self._grayscale = bool(self.config_manager.get("grayscale_matching", False))
+        self._tpl_gray: Dict[str, np.ndarray] = {}
+        # 当前截图的灰度版本（保留原截图引用，以对象身份判断是否同一帧）
+        self._gray_src: Optional[np.ndarray] = None
+        self._gray_img: Optional[np.ndarray] = None
+        
+        # OpenCL（T-API）加速：可用时matchTemplate通过UMat在GPU上执行
+        self._use_ocl = bool(self.config_manager.get("use_opencl", True)) and cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self._use_ocl)
+        self._tpl_umat: Dict[Tuple[str, int], cv2.UMat] = {}
+        if self._use_ocl:
+            self.logger.info("已启用OpenCL加速模板匹配")
+        
+        # CUDA加速：OpenCV带CUDA编译且有可用设备时，批量匹配在GPU上执行
+        self._cuda_matcher = self._create_cuda_matcher()
+        self._tpl_gpu: Dict[str, Any] = {}
+        if self._cuda_matcher is not None:
+            self.logger.info("已启用CUDA加速批量模板匹配")
+        
+        # 可复用的截图缓冲区（reuse_screenshot_buffer开启时使用）
+        self._reuse_shot_buf = bool(self.config_manager.get("reuse_screenshot_buffer", False))
+        self._shot_buf: Optional[np.ndarray] = None
+        # mss截图：实例不能跨线程使用，后台截图线程与主线程各持有一个
+        self._use_mss = self.config_manager.get("screenshot_backend", "pyautogui") == "mss"
+        if self._use_mss and not HAVE_MSS:
+            self.logger.warning("未安装mss，使用pyautogui截图")
+            self._use_mss = False
+        self._mss_local = threading.local()
+        # dxcam截图（Windows Desktop Duplication）：屏幕无变化时grab返回None，此时沿用上一张整屏图像
+        self._use_dxcam = self.config_manager.get("screenshot_backend", "pyautogui") == "dxcam"
+        if self._use_dxcam and not HAVE_DXCAM:
+            self.logger.warning("未安装dxcam，使用pyautogui截图")
+            self._use_dxcam = False
+        self._dxcam = None
+        self._dxcam_last: Optional[np.ndarray] = None
+        self._dxcam_lock = threading.Lock()
+        self.logger.info("截图方式: %s", "mss" if self._use_mss else "dxcam" if self._use_dxcam else "pyautogui")
+        
+        # 上次匹配结果备忘：(模板路径, 置信度) -> (中心点, 匹配框, 匹配框像素签名)
+        # 匹配框内像素未变化时直接复用上次的位置，跳过matchTemplate
+        self._use_pos_memo = bool(self.config_manager.get("position_memo", True))
+        self._pos_memo: Dict[Tuple[str, float], Tuple[Tuple[int, int], Tuple[int, int, int, int], int]] = {}
+        
+        # 整帧结果缓存：截图内容与上一帧完全相同时（界面尚未响应），直接返回上一帧的查找结果（包括未找到）
+        self._use_frame_results = bool(self.config_manager.get("frame_result_cache", True))
+        self._frame_hash_src: Optional[np.ndarray] = None
+        self._frame_hash: Optional[Tuple[int, Tuple[int, ...]]] = None
+        self._frame_results_hash: Optional[Tuple[int, Tuple[int, ...]]] = None
+        self._frame_results: Dict[Tuple[str, float], Optional[Tuple[int, int]]] = {}
+        
+        # 批量匹配的学习区域结果缓存：模板路径 -> (学习区域, 区域像素签名, 匹配结果)
+        # 整帧变化（如点击子节点）但学习区域内像素未变时，直接复用上次的匹配结果
+        self._use_roi_results = bool(self.config_manager.get("roi_result_cache", True))
+        self._roi_results: Dict[str, Tuple[Tuple[int, ...], Tuple[int, Tuple[int, ...]],
+                                           Tuple[Optional[Tuple[int, int]], float]]] = {}
+        
+        # 自动学习的搜索区域：首次在全图命中后，以命中位置为中心扩展出的像素区域
+        # 模板路径 -> (截图宽, 截图高, x0, y0, x1, y1)
+        self._learn_roi = bool(self.config_manager.get("learn_roi", True))
+        self._learned_roi: Dict[str, Tuple[int, int, int, int, int, int]] = {}
+        
+        # 批量匹配时使用预归一化匹配（积分图在同一帧的多个模板间共用，需安装numba）
+        self._prenormalized = bool(self.config_manager.get("prenormalized_matching", True)) and HAVE_NUMBA
+        if self._prenormalized or self.config_manager.get("fft_batch_matching", False):
+            # 归一化内核在匹配线程池中调用，需先在主线程中编译并启动并行运行时
+            warmup_ncc_kernel()
+        
+        # 批量匹配使用的线程池（matchTemplate执行期间会释放GIL），首次使用时创建
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取批量匹配线程池"""
+        if self._executor is None:
+            max_workers = min(4, os.cpu_count() or 1)
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="template-match")
+        return self._executor
     
-    def take_screenshot(self, region: Optional[Tuple[int, int, int, int]] = None, name: Optional[str] = None) -> np.ndarray:
+    def _create_cuda_matcher(self):
+        """创建CUDA模板匹配器，不可用时返回None"""
+        if not self.config_manager.get("use_cuda", True):
+            return None
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return None
+            # 灰度匹配时截图与模板都是单通道，上传与相关计算量都只有BGR的1/3
+            return cv2.cuda.createTemplateMatching(cv2.CV_8UC1 if self._grayscale else cv2.CV_8UC3,
+                                                   cv2.TM_CCOEFF_NORMED)
+        except (AttributeError, cv2.error) as e:
+            self.logger.debug("CUDA模板匹配不可用: %s", e)
+            return None
+    
+    def clear_template_cache(self):
+        """清空模板缓存（模板文件被新增或替换后调用）"""
+        self._tpl_img.clear()
+        self._tpl_missing.clear()
+        self._tpl_gray.clear()
+        self._tpl_proc.clear()
+        self._tpl_scaled.clear()
+        self._tpl_pyr.clear()
+        self._tpl_fft.clear()
+        self._tpl_zero_mean.clear()
+        self._tpl_umat.clear()
+        self._tpl_gpu.clear()
+        self._tpl_orb.clear()
+        self._pos_memo.clear()
+        self._learned_roi.clear()
+        self._frame_results.clear()
+        self._roi_results.clear()
+    
+    def get_template(self, template_path: str, gray: bool = False) -> Optional[np.ndarray]:
+        """
+        获取解码后的模板图片，首次访问时从磁盘读取并缓存
+        
+        Args:
+            template_path: 模板图片路径
+            gray: 是否返回灰度版本
+            
+        Returns:
+            模板图像或None（读取失败）
+        """
+        if gray:
+            template = self._tpl_gray.get(template_path)
+            if template is None:
+                template = self.get_template(template_path)
+                if template is not None:
+                    template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+                    self._tpl_gray[template_path] = template
+            return template
+        
+        template = self._tpl_img.get(template_path)
+        if template is None:
+            template = cv2.imread(template_path)
+            if template is not None:
+                self._tpl_img[template_path] = template
+        return template
+    
+    def _prepare_screenshot(self, screenshot: np.ndarray) -> np.ndarray:
+        """
+        按配置返回用于匹配的截图，灰度匹配时同一帧只转换一次
+        
+        Args:
+            screenshot: BGR屏幕截图
+            
+        Returns:
+            灰度或原始截图
+        """
+        if not self._grayscale or screenshot.ndim == 2:
+            return screenshot
+        gray = self._gray_img
+        if self._gray_src is not screenshot or gray is None:
+            gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+            self._gray_img, self._gray_src = gray, screenshot
+        return gray
+    
+    def _get_preprocessed_template(self, template: np.ndarray,
+                                   template_path: Optional[str] = None) -> Tuple[np.ndarray, ...]:
+        """
+        获取模板的预处理形式（灰度、高斯模糊、直方图均衡、边缘），按模板路径缓存
+        
+        Args:
+            template: 模板图像
+            template_path: 模板路径，为None时不缓存
+            
+        Returns:
+            (灰度, 模糊, 直方图均衡, 边缘)
+        """
+        processed = self._tpl_proc.get(template_path) if template_path else None
+        if processed is None:
+            gray = template if template.ndim == 2 else cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+            blur = cv2.GaussianBlur(gray, (3, 3), 0)
+            eq = cv2.equalizeHist(blur)
+            edges = cv2.Canny(eq, 50, 150)
+            processed = (gray, blur, eq, edges)
+            if template_path:
+                self._tpl_proc[template_path] = processed
+        return processed
+    
+    def _get_scaled_template(self, template: np.ndarray, template_path: str, scale: float) -> np.ndarray:
+        """获取缩放后的模板，按(模板路径, 缩放比例)缓存"""
+        key = (template_path, float(scale), template.ndim)
+        scaled = self._tpl_scaled.get(key)
+        if scaled is None:
+            scaled = cv2.resize(template, None, fx=scale, fy=scale)
+            self._tpl_scaled[key] = scaled
+        return scaled
+    
+    def _get_pyramid_template(self, template: np.ndarray, template_path: str, levels: int) -> np.ndarray:
+        """获取金字塔缩小levels层后的模板，按(模板路径, 层数, 通道数)缓存"""
+        key = (template_path, levels, template.ndim)
+        small = self._tpl_pyr.get(key)
+        if small is None:
+            small = template
+            for _ in range(levels):
+                small = cv2.pyrDown(small)
+            self._tpl_pyr[key] = small
+        return small
+    
+    def preload_templates(self, template_paths: Iterable[str]):
+        """预先读取并缓存一批模板图片"""
+        loaded = 0
+        for template_path in template_paths:
+            if template_path.lower().endswith(".png") and self.get_template(template_path) is not None:
+                loaded += 1
+        self.logger.debug("已预加载 %d 个模板图片", loaded)
+    
+    def load_learned_roi(self, cache_path: str):
+        """
+        从文件恢复上次运行学习到的搜索区域
+        
+        区域坐标相对于截图（窗口）区域，窗口移动不影响；截图尺寸变化时
+        由_match_learned_roi在首次使用时丢弃
+        
+        Args:
+            cache_path: 缓存文件路径
+        """
+        if not self._learn_roi or not os.path.exists(cache_path):
+            return
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            for name, roi in saved.items():
+                template_path = os.path.join(str(self.templates_dir), name)
+                if len(roi) == 6 and os.path.exists(template_path):
+                    self._learned_roi.setdefault(template_path, tuple(int(v) for v in roi))
+            self.logger.debug("已恢复 %d 个模板的搜索区域: %s", len(saved), cache_path)
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning("读取搜索区域缓存失败: %s", e)
+    
+    def save_learned_roi(self, cache_path: str):
+        """
+        将学习到的搜索区域保存到文件，供下次运行直接使用
+        
+        Args:
+            cache_path: 缓存文件路径
+        """
+        if not self._learn_roi:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            saved = {os.path.basename(path): list(roi) for path, roi in list(self._learned_roi.items())}
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            self.logger.warning("保存搜索区域缓存失败: %s", e)
+    
+    def _match(self, image, template: np.ndarray, method: int = cv2.TM_CCOEFF_NORMED,
+               template_key: Optional[str] = None) -> np.ndarray:
+        """
+        执行matchTemplate，OpenCL可用时走UMat路径
+        
+        Args:
+            image: 搜索图像（numpy数组或已上传的UMat）
+            template: 模板图像
+            method: 匹配方法
+            template_key: 模板缓存键（原始模板传入路径，上传到GPU的模板只上传一次）
+            
+        Returns:
+            匹配结果矩阵
+        """
+        if not self._use_ocl:
+            return cv2.matchTemplate(image, template, method)
+        
+        if template_key is None:
+            template_umat = cv2.UMat(template)
+        else:
+            # 同一模板可能同时有BGR和灰度两种形式
+            cache_key = (template_key, template.ndim)
+            template_umat = self._tpl_umat.get(cache_key)
+            if template_umat is None:
+                template_umat = cv2.UMat(template)
+                self._tpl_umat[cache_key] = template_umat
+        
+        if not isinstance(image, cv2.UMat):
+            image = cv2.UMat(image)
+        return cv2.matchTemplate(image, template_umat, method).get()
+    
+    def take_screenshot(self, region: Optional[Tuple[int, int, int, int]] = None, name: Optional[str] = None,
+                        reuse_buffer: Optional[bool] = None) -> np.ndarray:
         """
         截取屏幕或指定区域
         
+        复用缓冲区时返回的数组会在下一次截图时被覆盖，调用方需在下一次截图前用完
+        
         Args:
             region: 截图区域 (x, y, width, height)
             name: 截图名称（用于调试）
+            reuse_buffer: 是否写入可复用的缓冲区，默认按reuse_screenshot_buffer配置
             
         Returns:
             截图的numpy数组
         """
+        # 新的一帧，释放上一帧的灰度与频谱缓存（整帧结果按内容哈希保留）
+        self._gray_src = self._gray_img = None
+        self._frame_hash_src = None
+        self._frame_src = None
+        self._frame_cache.clear()
+        self._screen_pyramid.clear()
+        self._screen_orb.clear()
+        
         try:
-            if region:
-                screenshot = pyautogui.screenshot(region=region)
+            if self._use_mss:
+                # 直接在mss的BGRA缓冲区上建立视图，不经过PIL
+                src, code = self._grab_mss(region), cv2.COLOR_BGRA2BGR
+            elif self._use_dxcam:
+                src, code = self._grab_dxcam(region), cv2.COLOR_BGRA2BGR
             else:
-                screenshot = pyautogui.screenshot()
+                if region:
+                    screenshot = pyautogui.screenshot(region=region)
+                else:
+                    screenshot = pyautogui.screenshot()
+                src, code = np.asarray(screenshot), cv2.COLOR_RGB2BGR
             
             # 转换为opencv格式
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            if self._reuse_shot_buf if reuse_buffer is None else reuse_buffer:
+                # 尺寸不变时直接写入上一帧的缓冲区，省去每帧的大块内存分配
+                shape = src.shape[:2] + (3,)
+                if self._shot_buf is None or self._shot_buf.shape != shape:
+                    self._shot_buf = np.empty(shape, np.uint8)
+                screenshot_cv = cv2.cvtColor(src, code, dst=self._shot_buf)
+            else:
+                screenshot_cv = cv2.cvtColor(src, code)
 
             # 新增：将截图保存为本地图片，文件名带时间戳（调试模式下）
             # if self.config_manager.get("debug_mode", False) and name:
@@ -61,9 +413,58 @@ class TemplateManager:
             return screenshot_cv
             
         except Exception as e:
-            self.logger.error(f"截图失败: {e}")
+            self.logger.error("截图失败: %s", e)
             return None
     
+    def _grab_mss(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        用mss截图，返回mss内部BGRA缓冲区上的视图（下一次截图前有效）
+        
+        Args:
+            region: 截图区域 (x, y, width, height)，None为主显示器
+            
+        Returns:
+            BGRA格式的numpy数组
+        """
+        sct = getattr(self._mss_local, "sct", None)
+        if sct is None:
+            sct = self._mss_local.sct = mss.mss()
+        if region:
+            monitor = {"left": region[0], "top": region[1], "width": region[2], "height": region[3]}
+        else:
+            monitor = sct.monitors[1]
+        shot = sct.grab(monitor)
+        return np.frombuffer(shot.raw, np.uint8).reshape(shot.height, shot.width, 4)
+    
+    def _grab_dxcam(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        用dxcam截取主显示器整屏后裁剪出指定区域
+        
+        dxcam在屏幕自上次截图（不论区域）后没有变化时返回None，因此总是截取整屏，
+        只保存一张最新的整屏图像，返回None时从这张图像中裁剪
+        
+        Args:
+            region: 截图区域 (x, y, width, height)，None为整个显示器
+            
+        Returns:
+            BGRA格式的numpy数组（整屏图像上的视图）
+        """
+        # dxcam实例按显示器共用，后台截图线程与主线程需串行调用
+        with self._dxcam_lock:
+            if self._dxcam is None:
+                self._dxcam = dxcam.create(output_color="BGRA")
+            frame = self._dxcam.grab()
+            if frame is None:
+                frame = self._dxcam_last
+                if frame is None:
+                    raise RuntimeError("dxcam未返回截图")
+            else:
+                self._dxcam_last = frame
+        if region is None:
+            return frame
+        x, y, w, h = region
+        return frame[y:y + h, x:x + w]
+    
     def find_template(self, screenshot: np.ndarray, template_path: str, 
                      confidence: float = 0.8) -> Optional[Tuple[int, int]]:
         """
@@ -77,33 +478,852 @@ class TemplateManager:
         Returns:
             匹配位置的中心点坐标 (x, y) 或 None
         """
-        if not os.path.exists(template_path):
-            self.logger.warning(f"模板文件不存在: {template_path}")
-            return None
+        if template_path not in self._tpl_img:
+            if template_path in self._tpl_missing:
+                return None
+            if not os.path.exists(template_path):
+                self.logger.warning("模板文件不存在: %s", template_path)
+                self._tpl_missing.add(template_path)
+                return None
             
         try:
-            template = cv2.imread(template_path)
+            screenshot = self._prepare_screenshot(screenshot)
+            template = self.get_template(template_path, gray=screenshot.ndim == 2)
             if template is None:
-                self.logger.error(f"无法加载模板图片: {template_path}")
+                self.logger.error("无法加载模板图片: %s", template_path)
                 return None
             
-            # 自适应置信度调整
-            if self.config_manager.get("adaptive_confidence", True):
-                confidence = self._adjust_confidence(template_path, confidence)
-            
-            # 根据配置选择匹配算法
-            algorithm = self.config_manager.get("matching_algorithm", "enhanced")
-            
-            if algorithm == "basic":
-                return self._basic_template_matching(screenshot, template, confidence, template_path)
-            elif algorithm == "multi_method":
-                return self._multi_method_matching(screenshot, template, confidence, template_path)
-            else:  # enhanced
-                return self._enhanced_matching_pipeline(screenshot, template, confidence, template_path)
+            memo_key = (template_path, confidence)
+            if self._use_frame_results:
+                frame_hash = self._hash_frame(screenshot)
+                with self._frame_lock:
+                    if frame_hash == self._frame_results_hash and memo_key in self._frame_results:
+                        return self._frame_results[memo_key]
+                position = self._find_template_uncached(screenshot, template, confidence, template_path, memo_key)
+                with self._frame_lock:
+                    if frame_hash != self._frame_results_hash:
+                        self._frame_results_hash = frame_hash
+                        self._frame_results.clear()
+                    self._frame_results[memo_key] = position
+                return position
+            return self._find_template_uncached(screenshot, template, confidence, template_path, memo_key)
                 
         except Exception as e:
-            self.logger.error(f"模板匹配失败: {e}")
+            self.logger.error("模板匹配失败: %s", e)
+            return None
+    
+    def frame_signature(self, screenshot: np.ndarray) -> Tuple[int, Tuple[int, ...]]:
+        """
+        计算截图内容的签名，用于判断界面在两次截图之间是否发生变化
+        
+        Args:
+            screenshot: 屏幕截图
+            
+        Returns:
+            (哈希, 形状)
+        """
+        return self._hash_frame(screenshot)
+    
+    def _hash_frame(self, screenshot: np.ndarray) -> Tuple[int, Tuple[int, ...]]:
+        """计算截图内容的签名（哈希, 形状），同一帧只计算一次（有xxhash时使用xxhash，否则使用crc32）"""
+        with self._frame_lock:
+            if self._frame_hash_src is screenshot:
+                return self._frame_hash
+        frame_hash = self._hash_pixels(screenshot)
+        with self._frame_lock:
+            self._frame_hash, self._frame_hash_src = frame_hash, screenshot
+        return frame_hash
+    
+    @staticmethod
+    def _hash_pixels(image: np.ndarray) -> Tuple[int, Tuple[int, ...]]:
+        """计算图像像素的签名（哈希, 形状）"""
+        data = np.ascontiguousarray(image)
+        if HAVE_XXHASH:
+            return (xxhash.xxh3_64_intdigest(data), image.shape)
+        return (zlib.crc32(data), image.shape)
+    
+    def _find_template_uncached(self, screenshot: np.ndarray, template: np.ndarray, confidence: float,
+                                template_path: str, memo_key: Tuple[str, float]) -> Optional[Tuple[int, int]]:
+        """find_template的实际查找流程：位置备忘 -> 学习区域 -> ROI提示/全图（异常由find_template处理）"""
+        if self._use_pos_memo:
+            position = self._check_pos_memo(screenshot, template, memo_key)
+            if position is not None:
+                return position
+        
+        # 自适应置信度调整
+        if self.config_manager.get("adaptive_confidence", True):
+            confidence = self._adjust_confidence(template_path, confidence)
+        
+        # 先在上次命中位置附近搜索，未命中再按ROI提示/全图搜索
+        position = self._match_learned_roi(screenshot, template, confidence, template_path)
+        if position is None:
+            # 按ROI提示只在模板可能出现的区域内搜索
+            search_image, offset_x, offset_y = self._apply_roi_hint(screenshot, template, template_path)
+            position = self._match_pipeline(search_image, template, confidence, template_path)
+            if position is None:
+                return None
+            position = (position[0] + offset_x, position[1] + offset_y)
+            if self._learn_roi:
+                self._store_learned_roi(screenshot, template, template_path, position)
+        
+        if self._use_pos_memo:
+            self._store_pos_memo(screenshot, template, memo_key, position)
+        return position
+    
+    def _check_pos_memo(self, screenshot: np.ndarray, template: np.ndarray,
+                        memo_key: Tuple[str, float]) -> Optional[Tuple[int, int]]:
+        """
+        检查模板是否仍在上次的匹配位置
+        
+        匹配框内像素完全一致时直接复用；像素有变化（如悬停高亮）时只在匹配框上
+        计算一次模板匹配得分，仍达到阈值则复用并更新签名
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            memo_key: (模板路径, 置信度)
+            
+        Returns:
+            上次的匹配位置，或None（需要重新搜索）
+        """
+        memo = self._pos_memo.get(memo_key)
+        if memo is None:
+            return None
+        
+        position, (x, y, w, h), signature = memo
+        patch = screenshot[y:y + h, x:x + w]
+        if patch.shape[:2] != (h, w) or patch.shape != template.shape:
+            del self._pos_memo[memo_key]
+            return None
+        
+        if hash(patch.tobytes()) != signature:
+            score = float(cv2.matchTemplate(patch, template, cv2.TM_CCOEFF_NORMED)[0, 0])
+            if score < memo_key[1]:
+                del self._pos_memo[memo_key]
+                return None
+            self._pos_memo[memo_key] = (position, (x, y, w, h), hash(patch.tobytes()))
+            self.logger.debug("上次匹配位置得分 %.3f，复用: %s", score, memo_key[0])
+            return position
+        
+        self.logger.debug("复用上次匹配位置: %s, 位置: %s", memo_key[0], position)
+        return position
+    
+    def _store_pos_memo(self, screenshot: np.ndarray, template: np.ndarray,
+                        memo_key: Tuple[str, float], position: Tuple[int, int]):
+        """记录匹配位置及匹配框的像素签名"""
+        h, w = template.shape[:2]
+        x, y = max(0, position[0] - w // 2), max(0, position[1] - h // 2)
+        patch = screenshot[y:y + h, x:x + w]
+        if patch.shape[:2] == (h, w):
+            self._pos_memo[memo_key] = (position, (x, y, w, h), hash(patch.tobytes()))
+    
+    def find_template_peaks(self, screenshot: np.ndarray, template_path: str, confidence: float = 0.8,
+                            other_paths: Iterable[str] = ()) -> Tuple[Optional[Tuple[int, int]], float, float]:
+        """
+        查找模板的最佳匹配及次佳峰值，用于判断匹配是否有歧义
+        
+        次佳峰值在屏蔽最佳位置附近一个模板大小的区域后取得，两者之比接近1说明画面中存在多个相似区域；
+        达到置信度的次佳峰值若是other_paths中某个模板（该模板在此处得分更高，如相邻的另一种筛选图标），
+        则屏蔽后继续寻找下一个峰值
+        
+        Args:
+            screenshot: 屏幕截图
+            template_path: 模板图片路径
+            confidence: 匹配置信度
+            other_paths: 画面中可能出现的其他已知模板路径
+            
+        Returns:
+            (匹配中心点坐标或None, 最佳置信度, 次佳置信度)
+        """
+        screenshot = self._prepare_screenshot(screenshot)
+        template = self.get_template(template_path, gray=screenshot.ndim == 2)
+        if template is None:
+            self.logger.error("无法加载模板图片: %s", template_path)
+            return (None, 0.0, 0.0)
+        
+        search_image, offset_x, offset_y = self._apply_roi_hint(screenshot, template, template_path)
+        result = self._match(search_image, template, template_key=template_path)
+        _, best, _, best_loc = cv2.minMaxLoc(result)
+        
+        template_h, template_w = template.shape[:2]
+        others = [other for other in (self.get_template(path, gray=screenshot.ndim == 2) for path in other_paths
+                                      if path != template_path) if other is not None]
+        
+        def mask(loc: Tuple[int, int]):
+            x0, y0 = max(0, loc[0] - template_w // 2), max(0, loc[1] - template_h // 2)
+            result[y0:loc[1] + template_h // 2 + 1, x0:loc[0] + template_w // 2 + 1] = -1.0
+        
+        mask(best_loc)
+        _, second, _, second_loc = cv2.minMaxLoc(result)
+        # 最多跳过几个属于其他模板的峰值
+        for _ in range(4):
+            if second < confidence or not self._peak_is_other(search_image, second_loc, template.shape,
+                                                              second, others):
+                break
+            mask(second_loc)
+            _, second, _, second_loc = cv2.minMaxLoc(result)
+        
+        if best < confidence:
+            return (None, best, second)
+        
+        center = (best_loc[0] + template_w // 2 + offset_x, best_loc[1] + template_h // 2 + offset_y)
+        return (center, best, second)
+    
+    def _peak_is_other(self, image: np.ndarray, loc: Tuple[int, int], shape: Tuple[int, ...],
+                       score: float, others: Iterable[np.ndarray]) -> bool:
+        """
+        判断匹配峰值处是否是另一个已知模板（另一模板在峰值中心附近的得分更高）
+        
+        Args:
+            image: 搜索图像
+            loc: 峰值的左上角坐标
+            shape: 当前模板的形状
+            score: 当前模板在峰值处的得分
+            others: 其他已知模板
+            
+        Returns:
+            峰值是否属于其他模板
+        """
+        center_x, center_y = loc[0] + shape[1] // 2, loc[1] + shape[0] // 2
+        pad = 4
+        for other in others:
+            other_h, other_w = other.shape[:2]
+            x0, y0 = max(0, center_x - other_w // 2 - pad), max(0, center_y - other_h // 2 - pad)
+            x1 = min(image.shape[1], center_x + other_w - other_w // 2 + pad)
+            y1 = min(image.shape[0], center_y + other_h - other_h // 2 + pad)
+            if x1 - x0 < other_w or y1 - y0 < other_h:
+                continue
+            _, other_score, _, _ = cv2.minMaxLoc(cv2.matchTemplate(image[y0:y1, x0:x1], other, cv2.TM_CCOEFF_NORMED))
+            if other_score > score:
+                return True
+        return False
+    
+    def _match_pipeline(self, screenshot: np.ndarray, template: np.ndarray, 
+                        confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """根据配置选择匹配策略执行匹配"""
+        # 高分辨率截图先尝试金字塔粗到细匹配，未命中再走完整匹配流程
+        if (self.config_manager.get("use_pyramid_search", True)
+                and screenshot.shape[0] > self.config_manager.get("pyramid_min_height", 1080)):
+            result = self._pyramid_matching(screenshot, template, confidence, template_path)
+            if result:
+                return result
+        
+        # 根据配置选择匹配算法
+        algorithm = self.config_manager.get("matching_algorithm", "enhanced")
+        
+        if algorithm == "basic":
+            return self._basic_template_matching(screenshot, template, confidence, template_path)
+        elif algorithm == "sqdiff":
+            return self._sqdiff_template_matching(screenshot, template, confidence, template_path)
+        elif algorithm == "multi_method":
+            return self._multi_method_matching(screenshot, template, confidence, template_path)
+        elif algorithm == "orb":
+            return self._orb_matching(screenshot, template, confidence, template_path)
+        elif algorithm == "prefilter":
+            return self._prefilter_matching(screenshot, template, confidence, template_path)
+        else:  # enhanced
+            return self._enhanced_matching_pipeline(screenshot, template, confidence, template_path)
+    
+    def _match_learned_roi(self, screenshot: np.ndarray, template: np.ndarray,
+                           confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """
+        在自动学习的搜索区域内匹配
+        
+        未命中时保留该区域（模板可能只是暂时不在画面中），由调用方全图搜索，
+        在其他位置命中时再覆盖；截图尺寸变化时丢弃
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            confidence: 置信度阈值
+            template_path: 模板路径
+            
+        Returns:
+            匹配位置的中心点坐标 (x, y) 或 None
+        """
+        roi = self._learned_roi.get(template_path)
+        if roi is None:
+            return None
+        
+        screen_w, screen_h, x0, y0, x1, y1 = roi
+        if screenshot.shape[1] == screen_w and screenshot.shape[0] == screen_h:
+            position = self._match_pipeline(screenshot[y0:y1, x0:x1], template, confidence, template_path)
+            if position is not None:
+                return (position[0] + x0, position[1] + y0)
+        else:
+            # 截图尺寸变化，学习区域已无意义
+            del self._learned_roi[template_path]
+        return None
+    
+    def learned_region(self, template_paths: Iterable[str],
+                       screen_size: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        返回一组模板学习区域的并集
+        
+        Args:
+            template_paths: 模板路径列表
+            screen_size: 完整截图的 (高, 宽)，与学习时的截图尺寸不同则视为无效
+            
+        Returns:
+            (x0, y0, x1, y1)，任一模板没有有效的学习区域时返回None
+        """
+        screen_h, screen_w = screen_size
+        region = None
+        for template_path in template_paths:
+            roi = self._learned_roi.get(template_path)
+            if roi is None or roi[0] != screen_w or roi[1] != screen_h:
+                return None
+            _, _, x0, y0, x1, y1 = roi
+            if region is None:
+                region = (x0, y0, x1, y1)
+            else:
+                region = (min(region[0], x0), min(region[1], y0), max(region[2], x1), max(region[3], y1))
+        return region
+    
+    def find_templates_in_region(self, image: np.ndarray, offset: Tuple[int, int], template_paths: Iterable[str],
+                                 confidence: float = 0.8) -> Dict[str, Optional[Tuple[int, int]]]:
+        """
+        在按区域截取的局部截图上直接匹配多个模板（不使用也不更新学习区域）
+        
+        Args:
+            image: 局部截图
+            offset: 局部截图左上角在完整截图中的坐标 (x, y)
+            template_paths: 模板路径列表
+            confidence: 匹配置信度
+            
+        Returns:
+            {模板路径: 完整截图坐标系中的中心点坐标或None}
+        """
+        image = self._prepare_screenshot(image)
+        results: Dict[str, Optional[Tuple[int, int]]] = {}
+        for template_path in template_paths:
+            template = self.get_template(template_path, gray=image.ndim == 2)
+            position = None
+            if template is not None:
+                center, max_val = self._batch_score(image, image, 0, 0, template, template_path)
+                if center is not None and max_val >= confidence:
+                    position = (center[0] + offset[0], center[1] + offset[1])
+            results[template_path] = position
+        return results
+    
+    def _store_learned_roi(self, screenshot: np.ndarray, template: np.ndarray,
+                           template_path: str, position: Tuple[int, int]):
+        """以命中位置为中心、向外扩展roi_learn_margin倍模板尺寸，记录为该模板的搜索区域"""
+        screen_h, screen_w = screenshot.shape[:2]
+        template_h, template_w = template.shape[:2]
+        margin = self.config_manager.get("roi_learn_margin", 2.0)
+        half_w = int(template_w * (0.5 + margin))
+        half_h = int(template_h * (0.5 + margin))
+        self._learned_roi[template_path] = (
+            screen_w, screen_h,
+            max(0, position[0] - half_w), max(0, position[1] - half_h),
+            min(screen_w, position[0] + half_w), min(screen_h, position[1] + half_h)
+        )
+    
+    def _apply_roi_hint(self, screenshot: np.ndarray, template: np.ndarray, 
+                        template_path: str) -> Tuple[np.ndarray, int, int]:
+        """
+        根据配置中的roi_hints裁剪搜索区域
+        
+        roi_hints格式: {"模板文件名": [x, y, w, h]}，各值为相对截图宽高的比例(0~1)
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            template_path: 模板路径
+            
+        Returns:
+            (搜索图像, x偏移, y偏移)，没有可用的ROI时返回原截图
+        """
+        hint = self.config_manager.get("roi_hints", {}).get(os.path.basename(template_path))
+        if not hint:
+            return screenshot, 0, 0
+        
+        screen_h, screen_w = screenshot.shape[:2]
+        fx, fy, fw, fh = hint
+        x0 = max(0, int(fx * screen_w))
+        y0 = max(0, int(fy * screen_h))
+        x1 = min(screen_w, int((fx + fw) * screen_w))
+        y1 = min(screen_h, int((fy + fh) * screen_h))
+        
+        # ROI比模板还小时说明配置有误，退回全图搜索
+        template_h, template_w = template.shape[:2]
+        if x1 - x0 < template_w or y1 - y0 < template_h:
+            self.logger.warning("模板 %s 的ROI提示小于模板尺寸，使用全图搜索", template_path)
+            return screenshot, 0, 0
+        
+        return screenshot[y0:y1, x0:x1], x0, y0
+    
+    def find_templates_batch(self, screenshot: np.ndarray, template_paths: Iterable[str],
+                             confidence: float = 0.8) -> Dict[str, Tuple[Optional[Tuple[int, int]], float]]:
+        """
+        在同一张截图上批量匹配多个模板（TM_CCOEFF_NORMED）
+        
+        所有模板共用同一张截图；多个模板时在线程池中并行匹配，
+        单线程时相同尺寸的匹配结果矩阵只分配一次
+        
+        Args:
+            screenshot: 屏幕截图
+            template_paths: 模板图片路径列表
+            confidence: 匹配置信度
+            
+        Returns:
+            {模板路径: (中心点坐标或None, 最高置信度)}
+        """
+        template_paths = list(template_paths)
+        screenshot = self._prepare_screenshot(screenshot)
+        
+        if self._cuda_matcher is not None:
+            try:
+                return self._find_templates_batch_cuda(screenshot, template_paths, confidence)
+            except cv2.error as e:
+                self.logger.warning("CUDA批量匹配失败，回退到CPU: %s", e)
+                self._cuda_matcher = None
+        
+        if len(template_paths) > 1 and self.config_manager.get("fft_batch_matching", False):
+            return self._find_templates_batch_fft(screenshot, template_paths, confidence)
+        
+        # 多个模板时并行匹配；单线程时复用相同尺寸的结果矩阵
+        if len(template_paths) > 1 and self.config_manager.get("parallel_matching", True):
+            executor = self._get_executor()
+            futures = {
+                template_path: executor.submit(self._batch_match_one, screenshot, template_path, confidence)
+                for template_path in template_paths
+            }
+            return {template_path: future.result() for template_path, future in futures.items()}
+        
+        result_buffers: Dict[Tuple[int, int], np.ndarray] = {}
+        return {
+            template_path: self._batch_match_one(screenshot, template_path, confidence, result_buffers)
+            for template_path in template_paths
+        }
+    
+    def _find_templates_batch_cuda(self, screenshot: np.ndarray, template_paths: Iterable[str],
+                                   confidence: float) -> Dict[str, Tuple[Optional[Tuple[int, int]], float]]:
+        """
+        在GPU上批量匹配多个模板
+        
+        截图（或同一ROI）只上传一次，模板上传后缓存；每个模板使用独立的stream，
+        使多个匹配在GPU上重叠执行
+        
+        Args:
+            screenshot: 屏幕截图
+            template_paths: 模板图片路径列表
+            confidence: 匹配置信度
+            
+        Returns:
+            {模板路径: (中心点坐标或None, 最高置信度)}
+        """
+        results: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+        uploads: Dict[Tuple[int, int, int, int], Any] = {}
+        pending = []
+        
+        for template_path in template_paths:
+            template = self.get_template(template_path, gray=screenshot.ndim == 2)
+            if template is None:
+                self.logger.warning("无法加载模板图片: %s", template_path)
+                results[template_path] = (None, 0.0)
+                continue
+            
+            search_image, offset_x, offset_y = self._apply_roi_hint(screenshot, template, template_path)
+            search_h, search_w = search_image.shape[:2]
+            template_h, template_w = template.shape[:2]
+            if template_h > search_h or template_w > search_w:
+                results[template_path] = (None, 0.0)
+                continue
+            
+            upload_key = (offset_x, offset_y, search_w, search_h)
+            gpu_image = uploads.get(upload_key)
+            if gpu_image is None:
+                gpu_image = cv2.cuda_GpuMat()
+                gpu_image.upload(search_image)
+                uploads[upload_key] = gpu_image
+            
+            gpu_template = self._tpl_gpu.get(template_path)
+            if gpu_template is None:
+                gpu_template = cv2.cuda_GpuMat()
+                gpu_template.upload(template)
+                self._tpl_gpu[template_path] = gpu_template
+            
+            stream = cv2.cuda_Stream()
+            gpu_result = self._cuda_matcher.match(gpu_image, gpu_template, stream=stream)
+            pending.append((template_path, template_w, template_h, offset_x, offset_y, stream, gpu_result))
+        
+        for template_path, template_w, template_h, offset_x, offset_y, stream, gpu_result in pending:
+            stream.waitForCompletion()
+            _, max_val, _, max_loc = cv2.cuda.minMaxLoc(gpu_result)
+            
+            position = None
+            if max_val >= confidence:
+                position = (offset_x + max_loc[0] + template_w // 2, offset_y + max_loc[1] + template_h // 2)
+            results[template_path] = (position, float(max_val))
+        
+        return results
+    
+    def _find_templates_batch_fft(self, screenshot: np.ndarray, template_paths: Iterable[str],
+                                  confidence: float) -> Dict[str, Tuple[Optional[Tuple[int, int]], float]]:
+        """
+        在频域中批量匹配多个模板，同一搜索区域的截图只做一次DFT
+        
+        Args:
+            screenshot: 屏幕截图
+            template_paths: 模板图片路径列表
+            confidence: 匹配置信度
+            
+        Returns:
+            {模板路径: (中心点坐标或None, 最高置信度)}
+        """
+        results: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+        # 按搜索区域分组：(x0, y0) -> (搜索图像, [(模板路径, 模板)])
+        groups: Dict[Tuple[int, int], Tuple[np.ndarray, list]] = {}
+        
+        for template_path in template_paths:
+            template = self.get_template(template_path, gray=screenshot.ndim == 2)
+            if template is None:
+                self.logger.warning("无法加载模板图片: %s", template_path)
+                results[template_path] = (None, 0.0)
+                continue
+            
+            search_image, offset_x, offset_y = self._apply_roi_hint(screenshot, template, template_path)
+            if template.shape[0] > search_image.shape[0] or template.shape[1] > search_image.shape[1]:
+                results[template_path] = (None, 0.0)
+                continue
+            groups.setdefault((offset_x, offset_y), (search_image, []))[1].append((template_path, template))
+        
+        for (offset_x, offset_y), (search_image, group) in groups.items():
+            prepared = self._fft_prepare_image(screenshot, offset_x, offset_y, search_image)
+            for template_path, template in group:
+                result = self._fft_match(prepared, template, template_path)
+                _, max_val, _, max_loc = cv2.minMaxLoc(result)
+                template_h, template_w = template.shape[:2]
+                position = None
+                if max_val >= confidence:
+                    position = (offset_x + max_loc[0] + template_w // 2, offset_y + max_loc[1] + template_h // 2)
+                results[template_path] = (position, float(max_val))
+        
+        return results
+    
+    def _frame_stats(self, screenshot: np.ndarray, offset_x: int, offset_y: int,
+                     image: np.ndarray) -> Dict[str, Any]:
+        """
+        计算搜索图像的去均值浮点图与积分图，同一帧的同一搜索区域只计算一次
+        
+        Args:
+            screenshot: 完整截图（用于判断是否同一帧）
+            offset_x: 搜索区域在截图中的x偏移
+            offset_y: 搜索区域在截图中的y偏移
+            image: 搜索图像
+            
+        Returns:
+            截图数据：size、image（去均值浮点图）、sums（各通道积分图）、sq_sum（平方和积分图）
+        """
+        h, w = image.shape[:2]
+        key = (offset_x, offset_y, w, h)
+        with self._frame_lock:
+            if self._frame_src is not screenshot:
+                self._frame_src = screenshot
+                self._frame_cache.clear()
+            stats = self._frame_cache.get(key)
+            if stats is not None:
+                return stats
+            
+            channels = 1 if image.ndim == 2 else image.shape[2]
+            img = image.reshape(h, w, channels).astype(np.float32)
+            # 去掉全局均值以减小数值范围（模板已去均值，不影响互相关）
+            img -= img.reshape(-1, channels).mean(axis=0)
+            
+            stats = {
+                "size": (h, w),
+                "image": img if channels > 1 else img[:, :, 0],
+                # 窗口内 sum(I) 按通道、sum(I^2) 合并通道求积分图
+                "sums": np.stack([cv2.integral(np.ascontiguousarray(img[:, :, c]), sdepth=cv2.CV_64F)
+                                  for c in range(channels)]),
+                "sq_sum": cv2.integral((img * img).sum(axis=2), sdepth=cv2.CV_64F),
+            }
+            self._frame_cache[key] = stats
+            return stats
+    
+    def _fft_prepare_image(self, screenshot: np.ndarray, offset_x: int, offset_y: int,
+                           image: np.ndarray) -> Dict[str, Any]:
+        """
+        在_frame_stats的基础上补充搜索图像的各通道频谱
+        
+        Args:
+            screenshot: 完整截图（用于判断是否同一帧）
+            offset_x: 搜索区域在截图中的x偏移
+            offset_y: 搜索区域在截图中的y偏移
+            image: 搜索图像
+            
+        Returns:
+            频域匹配所需的截图数据
+        """
+        prepared = self._frame_stats(screenshot, offset_x, offset_y, image)
+        if "spectra" in prepared:
+            return prepared
+        
+        h, w = prepared["size"]
+        img = prepared["image"].reshape(h, w, -1)
+        dft_h, dft_w = cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w)
+        padded = np.zeros((dft_h, dft_w), np.float32)
+        spectra = []
+        for c in range(img.shape[2]):
+            padded[:h, :w] = img[:, :, c]
+            spectra.append(cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT))
+        
+        prepared["dft_size"] = (dft_h, dft_w)
+        prepared["spectra"] = spectra
+        return prepared
+    
+    def _zero_mean_template(self, template: np.ndarray, template_path: str) -> Tuple[np.ndarray, float]:
+        """获取按通道去均值的浮点模板及其平方和，按(模板路径, 通道数)缓存"""
+        key = (template_path, template.ndim)
+        cached = self._tpl_zero_mean.get(key)
+        if cached is None:
+            tpl = template.astype(np.float32)
+            if tpl.ndim == 2:
+                tpl -= tpl.mean()
+            else:
+                tpl -= tpl.reshape(-1, tpl.shape[2]).mean(axis=0)
+            cached = (tpl, float((tpl * tpl).sum()))
+            self._tpl_zero_mean[key] = cached
+        return cached
+    
+    def _prenormalized_match(self, screenshot: np.ndarray, offset_x: int, offset_y: int,
+                             image: np.ndarray, template: np.ndarray, template_path: str) -> np.ndarray:
+        """
+        预归一化的TM_CCOEFF_NORMED：去均值模板与截图做TM_CCORR得到分子，
+        分母由本帧共用的积分图计算，归一化在Numba内核中完成
+        
+        Args:
+            screenshot: 完整截图（用于判断是否同一帧）
+            offset_x: 搜索区域在截图中的x偏移
+            offset_y: 搜索区域在截图中的y偏移
+            image: 搜索图像
+            template: 模板图像
+            template_path: 模板路径
+            
+        Returns:
+            匹配结果矩阵
+        """
+        stats = self._frame_stats(screenshot, offset_x, offset_y, image)
+        tpl, template_norm = self._zero_mean_template(template, template_path)
+        numerator = cv2.matchTemplate(stats["image"], tpl, cv2.TM_CCORR)
+        th, tw = template.shape[:2]
+        return normalize_ccoeff(numerator, stats["sq_sum"], stats["sums"], th, tw, template_norm)
+    
+    def _fft_template(self, template: np.ndarray, template_path: str,
+                      dft_size: Tuple[int, int]) -> Tuple[list, float]:
+        """
+        获取去均值模板在指定DFT尺寸下的各通道频谱及其平方和，按(模板路径, DFT尺寸, 通道数)缓存
+        
+        Args:
+            template: 模板图像
+            template_path: 模板路径
+            dft_size: DFT尺寸 (高, 宽)
+            
+        Returns:
+            (各通道频谱, 去均值模板的平方和)
+        """
+        key = (template_path, dft_size, template.ndim)
+        cached = self._tpl_fft.get(key)
+        if cached is not None:
+            return cached
+        
+        th, tw = template.shape[:2]
+        channels = 1 if template.ndim == 2 else template.shape[2]
+        tpl = template.reshape(th, tw, channels).astype(np.float32)
+        tpl -= tpl.reshape(-1, channels).mean(axis=0)
+        
+        padded = np.zeros(dft_size, np.float32)
+        spectra = []
+        for c in range(channels):
+            padded[:th, :tw] = tpl[:, :, c]
+            spectra.append(cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT))
+        
+        cached = (spectra, float((tpl * tpl).sum()))
+        self._tpl_fft[key] = cached
+        return cached
+    
+    def _fft_match(self, prepared: Dict[str, Any], template: np.ndarray, template_path: str) -> np.ndarray:
+        """
+        用预先计算的截图频谱计算单个模板的TM_CCOEFF_NORMED结果
+        
+        分子为去均值模板与截图的互相关（各通道频谱相乘后相加，只做一次逆变换），
+        分母中的窗口方差由截图的积分图求得
+        
+        Args:
+            prepared: _fft_prepare_image的返回值
+            template: 模板图像（通道数与搜索图像相同）
+            template_path: 模板路径
+            
+        Returns:
+            匹配结果矩阵
+        """
+        h, w = prepared["size"]
+        th, tw = template.shape[:2]
+        rh, rw = h - th + 1, w - tw + 1
+        n = th * tw
+        
+        template_spectra, template_norm = self._fft_template(template, template_path, prepared["dft_size"])
+        spectrum = None
+        for image_spectrum, template_spectrum in zip(prepared["spectra"], template_spectra):
+            product = cv2.mulSpectrums(image_spectrum, template_spectrum, 0, conjB=True)
+            spectrum = product if spectrum is None else spectrum + product
+        numerator = cv2.idft(spectrum, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)[:rh, :rw]
+        
+        if HAVE_NUMBA:
+            return normalize_ccoeff(numerator, prepared["sq_sum"], prepared["sums"], th, tw, template_norm)
+        
+        def window_sum(integral):
+            return integral[th:th + rh, tw:tw + rw] - integral[:rh, tw:tw + rw] - integral[th:th + rh, :rw] + integral[:rh, :rw]
+        
+        variance = window_sum(prepared["sq_sum"])
+        for integral in prepared["sums"]:
+            s = window_sum(integral)
+            variance -= s * s / n
+        
+        denominator = np.sqrt(np.maximum(variance, 0) * template_norm)
+        # 与OpenCV一致：纯色窗口（方差为0）的结果记为0
+        result = np.zeros((rh, rw), np.float32)
+        valid = denominator > 1e-6 * max(template_norm, 1.0)
+        result[valid] = numerator[valid] / denominator[valid]
+        return np.clip(result, -1.0, 1.0)
+    
+    def _batch_match_one(self, screenshot: np.ndarray, template_path: str, confidence: float,
+                         result_buffers: Optional[Dict[Tuple[int, int], np.ndarray]] = None
+                         ) -> Tuple[Optional[Tuple[int, int]], float]:
+        """
+        批量匹配中的单个模板匹配
+        
+        Args:
+            screenshot: 屏幕截图
+            template_path: 模板路径
+            confidence: 匹配置信度
+            result_buffers: 可复用的结果矩阵（仅单线程时传入）
+            
+        Returns:
+            (中心点坐标或None, 最高置信度)
+        """
+        template = self.get_template(template_path, gray=screenshot.ndim == 2)
+        if template is None:
+            self.logger.warning("无法加载模板图片: %s", template_path)
+            return (None, 0.0)
+        
+        # 先在上次命中位置附近匹配，未达到阈值时回退到ROI提示/全图搜索；
+        # 学习区域只在截图尺寸变化或全图搜索在其他位置命中时更新，模板暂时消失时保留
+        roi = self._learned_roi.get(template_path) if self._learn_roi else None
+        if roi is not None:
+            screen_w, screen_h, x0, y0, x1, y1 = roi
+            if screenshot.shape[1] == screen_w and screenshot.shape[0] == screen_h:
+                region = screenshot[y0:y1, x0:x1]
+                signature = self._hash_pixels(region) if self._use_roi_results else None
+                cached = self._roi_results.get(template_path)
+                if cached is not None and cached[0] == roi and cached[1] == signature:
+                    match = cached[2]
+                else:
+                    match = self._batch_score(screenshot, region, x0, y0, template, template_path, result_buffers)
+                    if signature is not None:
+                        self._roi_results[template_path] = (roi, signature, match)
+                if match[0] is not None and match[1] >= confidence:
+                    return match
+            else:
+                self._learned_roi.pop(template_path, None)
+        
+        search_image, offset_x, offset_y = self._apply_roi_hint(screenshot, template, template_path)
+        match = None
+        if (self.config_manager.get("use_pyramid_search", True)
+                and search_image.shape[0] > self.config_manager.get("pyramid_min_height", 1080)):
+            match = self._batch_pyramid(screenshot, search_image, offset_x, offset_y,
+                                        template, template_path, confidence)
+        if match is None:
+            match = self._batch_score(screenshot, search_image, offset_x, offset_y,
+                                      template, template_path, result_buffers)
+        position, max_val = match
+        if position is None or max_val < confidence:
+            return (None, max_val)
+        if self._learn_roi:
+            self._store_learned_roi(screenshot, template, template_path, position)
+        return (position, max_val)
+    
+    def _batch_pyramid(self, screenshot: np.ndarray, search_image: np.ndarray, offset_x: int, offset_y: int,
+                       template: np.ndarray, template_path: str,
+                       confidence: float) -> Optional[Tuple[Optional[Tuple[int, int]], float]]:
+        """
+        批量匹配中的金字塔粗到细搜索
+        
+        Args:
+            screenshot: 完整截图
+            search_image: 搜索区域图像
+            offset_x: 搜索区域在截图中的x偏移
+            offset_y: 搜索区域在截图中的y偏移
+            template: 模板图像
+            template_path: 模板路径
+            confidence: 匹配置信度
+            
+        Returns:
+            精匹配达到阈值时返回 (中心点坐标, 置信度)；模板过小、粗匹配分数过低或精匹配未达到阈值时
+            返回None，由调用方全分辨率匹配（细小图标缩小后粗匹配分数可能远低于实际分数）
+        """
+        levels = self.config_manager.get("pyramid_levels", 2)
+        factor = 2 ** levels
+        template_h, template_w = template.shape[:2]
+        if min(template_h, template_w) // factor < 8:
+            return None
+        
+        small_image = self._get_pyramid_screenshot(search_image, levels)
+        small_template = self._get_pyramid_template(template, template_path, levels)
+        _, coarse_val, _, coarse_loc = cv2.minMaxLoc(self._match(small_image, small_template))
+        if coarse_val < confidence - 0.1:
             return None
+        
+        margin = factor * 2
+        search_h, search_w = search_image.shape[:2]
+        x0 = max(0, coarse_loc[0] * factor - margin)
+        y0 = max(0, coarse_loc[1] * factor - margin)
+        x1 = min(search_w, coarse_loc[0] * factor + template_w + margin)
+        y1 = min(search_h, coarse_loc[1] * factor + template_h + margin)
+        match = self._batch_score(screenshot, search_image[y0:y1, x0:x1], offset_x + x0, offset_y + y0,
+                                  template, template_path)
+        if match[0] is None or match[1] < confidence:
+            return None
+        return match
+    
+    def _batch_score(self, screenshot: np.ndarray, search_image: np.ndarray, offset_x: int, offset_y: int,
+                     template: np.ndarray, template_path: str,
+                     result_buffers: Optional[Dict[Tuple[int, int], np.ndarray]] = None
+                     ) -> Tuple[Optional[Tuple[int, int]], float]:
+        """
+        在搜索区域内匹配模板，返回最高分位置（不做阈值判断）
+        
+        Args:
+            screenshot: 完整截图
+            search_image: 搜索区域图像
+            offset_x: 搜索区域在截图中的x偏移
+            offset_y: 搜索区域在截图中的y偏移
+            template: 模板图像
+            template_path: 模板路径
+            result_buffers: 可复用的结果矩阵（仅单线程时传入）
+            
+        Returns:
+            (最高分位置的中心点坐标，搜索区域小于模板时为None, 最高置信度)
+        """
+        search_h, search_w = search_image.shape[:2]
+        template_h, template_w = template.shape[:2]
+        if template_h > search_h or template_w > search_w:
+            return (None, 0.0)
+        
+        if self._prenormalized and not self._use_ocl:
+            result = self._prenormalized_match(screenshot, offset_x, offset_y, search_image, template, template_path)
+        elif self._use_ocl or result_buffers is None:
+            result = self._match(search_image, template, template_key=template_path)
+        else:
+            # 复用相同尺寸的结果矩阵
+            result_shape = (search_h - template_h + 1, search_w - template_w + 1)
+            result = cv2.matchTemplate(search_image, template, cv2.TM_CCOEFF_NORMED,
+                                       result=result_buffers.get(result_shape))
+            result_buffers[result_shape] = result
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return ((offset_x + max_loc[0] + template_w // 2, offset_y + max_loc[1] + template_h // 2), float(max_val))
     
     def _adjust_confidence(self, template_path: str, base_confidence: float) -> float:
         """
@@ -129,7 +1349,7 @@ class TemplateManager:
         for key, adjustment in adjustments.items():
             if key in template_name:
                 adjusted = base_confidence + adjustment
-                self.logger.debug(f"为模板 {template_name} 调整置信度: {base_confidence:.3f} -> {adjusted:.3f}")
+                self.logger.debug("为模板 %s 调整置信度: %.3f -> %.3f", template_name, base_confidence, adjusted)
                 return max(0.5, min(0.95, adjusted))  # 限制在合理范围内
         
         return base_confidence
@@ -137,7 +1357,7 @@ class TemplateManager:
     def _basic_template_matching(self, screenshot: np.ndarray, template: np.ndarray, 
                                 confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
         """基础模板匹配"""
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
+        result = self._match(screenshot, template, template_key=template_path)
         _, max_val, _, max_loc = cv2.minMaxLoc(result)
         
         if max_val >= confidence:
@@ -145,14 +1365,283 @@ class TemplateManager:
             center_x = max_loc[0] + template_w // 2
             center_y = max_loc[1] + template_h // 2
             
-            self.logger.info(f"基础匹配成功: {template_path}, 置信度: {max_val:.3f}, 位置: ({center_x}, {center_y})")
+            self.logger.info("基础匹配成功: %s, 置信度: %.3f, 位置: (%d, %d)", template_path, max_val, center_x, center_y)
+            return (center_x, center_y)
+        
+        return None
+    
+    def _orb_features(self, image: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        提取ORB特征点坐标与描述子
+        
+        Args:
+            image: 灰度或BGR图像
+            
+        Returns:
+            (特征点坐标 (N, 2), 描述子或None)
+        """
+        if self._orb is None:
+            # 界面图标只有几十像素，缩小边缘与描述子窗口，否则模板上提取不到特征点
+            self._orb = cv2.ORB_create(self.config_manager.get("orb_features", 5000),
+                                       edgeThreshold=15, patchSize=15)
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        keypoints, descriptors = self._orb.detectAndCompute(gray, None)
+        points = np.array([kp.pt for kp in keypoints], np.float32).reshape(-1, 2)
+        return points, descriptors
+    
+    def _orb_matching(self, screenshot: np.ndarray, template: np.ndarray,
+                      confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """
+        ORB特征匹配：用特征点对应关系估计模板位置，再在该位置附近做一次小范围NCC确认
+        
+        匹配成本与特征点数量相关而与像素数无关；特征点不足时回退到基础模板匹配
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            confidence: 置信度阈值
+            template_path: 模板路径
+            
+        Returns:
+            匹配位置的中心点坐标 (x, y) 或 None
+        """
+        min_matches = self.config_manager.get("orb_min_matches", 5)
+        
+        tpl_features = self._tpl_orb.get(template_path)
+        if tpl_features is None:
+            tpl_features = self._orb_features(template)
+            self._tpl_orb[template_path] = tpl_features
+        tpl_points, tpl_des = tpl_features
+        
+        key = (screenshot.__array_interface__["data"][0], screenshot.shape, screenshot.strides)
+        cached = self._screen_orb.get(key)
+        if cached is None:
+            cached = (screenshot,) + self._orb_features(screenshot)
+            with self._frame_lock:
+                if len(self._screen_orb) >= 8:
+                    self._screen_orb.clear()
+                self._screen_orb[key] = cached
+        _, screen_points, screen_des = cached
+        
+        if tpl_des is None or screen_des is None or len(tpl_des) < min_matches:
+            return self._basic_template_matching(screenshot, template, confidence, template_path)
+        
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        max_distance = self.config_manager.get("orb_max_distance", 40)
+        matches = [m for m in matcher.match(tpl_des, screen_des) if m.distance < max_distance]
+        if len(matches) < min_matches:
+            return self._basic_template_matching(screenshot, template, confidence, template_path)
+        
+        # 图标不缩放不旋转，每对特征点给出一个模板左上角的估计，取中位数抗误匹配
+        corners = (screen_points[[m.trainIdx for m in matches]]
+                   - tpl_points[[m.queryIdx for m in matches]])
+        corner_x, corner_y = (int(v) for v in np.median(corners, axis=0).round())
+        
+        # 在估计位置附近确认置信度，阈值语义与模板匹配一致
+        template_h, template_w = template.shape[:2]
+        margin = 4
+        screen_h, screen_w = screenshot.shape[:2]
+        x0, y0 = max(0, corner_x - margin), max(0, corner_y - margin)
+        x1 = min(screen_w, corner_x + template_w + margin)
+        y1 = min(screen_h, corner_y + template_h + margin)
+        roi = screenshot[y0:y1, x0:x1]
+        if roi.shape[0] < template_h or roi.shape[1] < template_w:
+            return self._basic_template_matching(screenshot, template, confidence, template_path)
+        
+        result = self._match(roi, template, template_key=template_path)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < confidence:
+            return self._basic_template_matching(screenshot, template, confidence, template_path)
+        
+        center_x = x0 + max_loc[0] + template_w // 2
+        center_y = y0 + max_loc[1] + template_h // 2
+        self.logger.info("ORB匹配成功: %s, 特征匹配数: %d, 置信度: %.3f, 位置: (%d, %d)", template_path, len(matches), max_val, center_x, center_y)
+        return (center_x, center_y)
+    
+    def _prefilter_matching(self, screenshot: np.ndarray, template: np.ndarray,
+                            confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """
+        积分图预筛选匹配：按步长用积分图计算每个窗口的均值与标准差，
+        与模板统计量最接近的少数候选窗口再做局部TM_CCOEFF_NORMED确认
+        
+        预筛选只需O(W*H)次运算，NCC只在候选附近的小区域内执行
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            confidence: 置信度阈值
+            template_path: 模板路径
+            
+        Returns:
+            匹配位置的中心点坐标 (x, y) 或 None
+        """
+        gray = screenshot if screenshot.ndim == 2 else cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        tpl = template if template.ndim == 2 else cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        screen_h, screen_w = gray.shape
+        template_h, template_w = tpl.shape
+        if template_h > screen_h or template_w > screen_w:
+            return None
+        
+        stride = max(1, self.config_manager.get("prefilter_stride", 4))
+        top_k = max(1, self.config_manager.get("prefilter_candidates", 16))
+        
+        # 按步长取窗口左上角，用积分图求窗口内的和与平方和
+        sums, sq_sums = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        ys = np.arange(0, screen_h - template_h + 1, stride)
+        xs = np.arange(0, screen_w - template_w + 1, stride)
+        y0, y1 = ys[:, None], ys[:, None] + template_h
+        x0, x1 = xs[None, :], xs[None, :] + template_w
+        n = template_h * template_w
+        win_mean = (sums[y1, x1] - sums[y0, x1] - sums[y1, x0] + sums[y0, x0]) / n
+        win_sq = (sq_sums[y1, x1] - sq_sums[y0, x1] - sq_sums[y1, x0] + sq_sums[y0, x0]) / n
+        win_std = np.sqrt(np.maximum(win_sq - win_mean * win_mean, 0.0))
+        
+        tpl_mean, tpl_std = (float(v[0][0]) for v in cv2.meanStdDev(tpl))
+        distance = np.abs(win_mean - tpl_mean) + np.abs(win_std - tpl_std)
+        flat = distance.ravel()
+        top_k = min(top_k, flat.size)
+        candidates = np.argpartition(flat, top_k - 1)[:top_k]
+        
+        # 在每个候选窗口周围一个步长的范围内做NCC确认
+        best_val, best_loc = -1.0, None
+        for index in candidates:
+            cy, cx = int(ys[index // len(xs)]), int(xs[index % len(xs)])
+            rx0, ry0 = max(0, cx - stride), max(0, cy - stride)
+            rx1 = min(screen_w, cx + template_w + stride)
+            ry1 = min(screen_h, cy + template_h + stride)
+            result = cv2.matchTemplate(gray[ry0:ry1, rx0:rx1], tpl, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (rx0 + max_loc[0], ry0 + max_loc[1])
+        
+        if best_val >= confidence:
+            center_x = best_loc[0] + template_w // 2
+            center_y = best_loc[1] + template_h // 2
+            self.logger.info("预筛选匹配成功: %s, 置信度: %.3f, 位置: (%d, %d)", template_path, best_val, center_x, center_y)
+            return (center_x, center_y)
+        
+        return None
+    
+    def _sqdiff_template_matching(self, screenshot: np.ndarray, template: np.ndarray, 
+                                  confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """
+        平方差模板匹配（TM_SQDIFF_NORMED）
+        
+        不需要计算均值归一化，比TM_CCOEFF_NORMED开销更小；
+        置信度按 1 - 最小平方差 换算，与其他方法的阈值保持同一量纲
+        """
+        result = self._match(screenshot, template, cv2.TM_SQDIFF_NORMED, template_key=template_path)
+        min_val, _, min_loc, _ = cv2.minMaxLoc(result)
+        match_confidence = 1 - min_val
+        
+        if match_confidence >= confidence:
+            template_h, template_w = template.shape[:2]
+            center_x = min_loc[0] + template_w // 2
+            center_y = min_loc[1] + template_h // 2
+            
+            self.logger.info("平方差匹配成功: %s, 置信度: %.3f, 位置: (%d, %d)", template_path, match_confidence, center_x, center_y)
+            return (center_x, center_y)
+        
+        return None
+    
+    def _pyramid_matching(self, screenshot: np.ndarray, template: np.ndarray, 
+                          confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
+        """
+        金字塔粗到细匹配：先在缩小的图像上定位，再在全分辨率的局部区域精确匹配
+        
+        Args:
+            screenshot: 屏幕截图
+            template: 模板图像
+            confidence: 置信度阈值
+            template_path: 模板路径
+            
+        Returns:
+            匹配位置的中心点坐标 (x, y) 或 None
+        """
+        levels = self.config_manager.get("pyramid_levels", 2)
+        factor = 2 ** levels
+        template_h, template_w = template.shape[:2]
+        
+        # 模板缩小后过小会失去辨识度，直接交给全分辨率匹配
+        if min(template_h, template_w) // factor < 8:
+            return None
+        
+        small_screenshot = self._get_pyramid_screenshot(screenshot, levels)
+        small_template = self._get_pyramid_template(template, template_path, levels)
+        
+        result = self._match(small_screenshot, small_template)
+        _, coarse_val, _, coarse_loc = cv2.minMaxLoc(result)
+        
+        # 粗匹配阶段放宽阈值，最终以全分辨率精匹配的置信度为准
+        if coarse_val < confidence - 0.1:
+            return None
+        
+        # 在全分辨率截图上裁剪候选区域进行精匹配
+        margin = factor * 2
+        screen_h, screen_w = screenshot.shape[:2]
+        x0 = max(0, coarse_loc[0] * factor - margin)
+        y0 = max(0, coarse_loc[1] * factor - margin)
+        x1 = min(screen_w, coarse_loc[0] * factor + template_w + margin)
+        y1 = min(screen_h, coarse_loc[1] * factor + template_h + margin)
+        roi = screenshot[y0:y1, x0:x1]
+        if roi.shape[0] < template_h or roi.shape[1] < template_w:
+            return None
+        
+        result = self._match(roi, template, template_key=template_path)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        
+        if max_val >= confidence:
+            center_x = x0 + max_loc[0] + template_w // 2
+            center_y = y0 + max_loc[1] + template_h // 2
+            
+            self.logger.info("金字塔匹配成功: %s, 置信度: %.3f, 位置: (%d, %d)", template_path, max_val, center_x, center_y)
             return (center_x, center_y)
         
         return None
     
+    def _get_pyramid_screenshot(self, screenshot: np.ndarray, levels: int) -> np.ndarray:
+        """
+        获取缩小levels层后的截图，同一帧（同一搜索区域）只计算一次
+        
+        缓存项持有原图引用，原图内存不会被释放复用，因此数据地址相同即为同一图像；
+        复用截图缓冲区时由take_screenshot清空缓存
+        
+        Args:
+            screenshot: 屏幕截图（或其ROI切片）
+            levels: 金字塔层数
+            
+        Returns:
+            缩小后的截图
+        """
+        key = (screenshot.__array_interface__["data"][0], screenshot.shape, screenshot.strides, levels)
+        cached = self._screen_pyramid.get(key)
+        if cached is not None:
+            return cached[1]
+        
+        small = screenshot
+        for _ in range(levels):
+            small = cv2.pyrDown(small)
+        with self._frame_lock:
+            # 截图来自后台线程时take_screenshot不会被调用，限制缓存数量
+            if len(self._screen_pyramid) >= 8:
+                self._screen_pyramid.clear()
+            self._screen_pyramid[key] = (screenshot, small)
+        return small
+    
     def _multi_method_matching(self, screenshot: np.ndarray, template: np.ndarray, 
                               confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
         """多方法模板匹配"""
+        best = self._multi_method_best(screenshot, template, template_path)
+        return self._multi_method_position(best, template, confidence, template_path)
+    
+    def _multi_method_best(self, screenshot: np.ndarray, template: np.ndarray,
+                           template_path: str) -> Tuple[float, Optional[Tuple[int, int]], Optional[str]]:
+        """
+        用三种匹配方法计算最高分，结果与阈值无关，可用不同阈值多次判断
+        
+        Returns:
+            (最高置信度, 左上角位置, 方法名)
+        """
         matching_methods = [
             (cv2.TM_CCOEFF_NORMED, "相关系数"),
             (cv2.TM_CCORR_NORMED, "相关性"),
@@ -163,8 +1652,11 @@ class TemplateManager:
         best_location = None
         best_method = None
         
+        # 三种方法共用同一张截图，OpenCL模式下只上传一次
+        image = cv2.UMat(screenshot) if self._use_ocl else screenshot
+        
         for method, method_name in matching_methods:
-            result = cv2.matchTemplate(screenshot, template, method)
+            result = self._match(image, template, method, template_key=template_path)
             
             if method == cv2.TM_SQDIFF_NORMED:
                 min_val, _, min_loc, _ = cv2.minMaxLoc(result)
@@ -179,13 +1671,19 @@ class TemplateManager:
                 best_confidence = current_confidence
                 best_location = current_loc
                 best_method = method_name
-        print("confidence: " + str(confidence))
+        return (best_confidence, best_location, best_method)
+    
+    def _multi_method_position(self, best: Tuple[float, Optional[Tuple[int, int]], Optional[str]],
+                               template: np.ndarray, confidence: float,
+                               template_path: str) -> Optional[Tuple[int, int]]:
+        """按阈值判断_multi_method_best的结果，达到阈值时返回中心点坐标"""
+        best_confidence, best_location, best_method = best
         if best_confidence >= confidence and best_location is not None:
             template_h, template_w = template.shape[:2]
             center_x = best_location[0] + template_w // 2
             center_y = best_location[1] + template_h // 2
             
-            self.logger.info(f"多方法匹配成功 ({best_method}): {template_path}, 置信度: {best_confidence:.3f}, 位置: ({center_x}, {center_y})")
+            self.logger.info("多方法匹配成功 (%s): %s, 置信度: %.3f, 位置: (%d, %d)", best_method, template_path, best_confidence, center_x, center_y)
             return (center_x, center_y)
         
         return None
@@ -193,8 +1691,9 @@ class TemplateManager:
     def _enhanced_matching_pipeline(self, screenshot: np.ndarray, template: np.ndarray, 
                                    confidence: float, template_path: str) -> Optional[Tuple[int, int]]:
         """增强匹配管道，结合多种技术"""
-        # 步骤1: 多方法匹配
-        result = self._multi_method_matching(screenshot, template, confidence, template_path)
+        # 步骤1: 多方法匹配（各方法的最高分保留给步骤4使用）
+        best = self._multi_method_best(screenshot, template, template_path)
+        result = self._multi_method_position(best, template, confidence, template_path)
         if result:
             return result
         
@@ -206,16 +1705,17 @@ class TemplateManager:
         
         # 步骤3: 图像预处理匹配
         if self.config_manager.get("enable_preprocessing", True):
-            result = self._enhanced_template_matching(screenshot, template, confidence)
+            result = self._enhanced_template_matching(screenshot, template, confidence, template_path)
             if result:
-                self.logger.info(f"预处理匹配成功: {template_path}")
+                self.logger.info("预处理匹配成功: %s", template_path)
                 return result
         
         # 步骤4: 降低置信度重试
         if confidence > 0.6 and self.config_manager.get("adaptive_confidence", True):
             lower_confidence = max(0.5, confidence - 0.2)
-            self.logger.debug(f"降低置信度重试: {confidence:.3f} -> {lower_confidence:.3f}")
-            return self._multi_method_matching(screenshot, template, lower_confidence, template_path)
+            self.logger.debug("降低置信度重试: %.3f -> %.3f", confidence, lower_confidence)
+            # 匹配结果与阈值无关，直接用步骤1的最高分判断
+            return self._multi_method_position(best, template, lower_confidence, template_path)
         
         return None
     
@@ -231,7 +1731,7 @@ class TemplateManager:
         
         for scale in scales:
             # 缩放模板
-            scaled_template = cv2.resize(template, None, fx=scale, fy=scale)
+            scaled_template = self._get_scaled_template(template, template_path, scale)
             
             # 检查缩放后的模板是否超出截图尺寸
             if (scaled_template.shape[0] > screenshot.shape[0] or 
@@ -239,7 +1739,7 @@ class TemplateManager:
                 continue
             
             # 模板匹配
-            result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
+            result = self._match(screenshot, scaled_template)
             _, max_val, _, max_loc = cv2.minMaxLoc(result)
             
             if max_val > best_confidence:
@@ -249,12 +1749,12 @@ class TemplateManager:
         
         if best_confidence >= confidence and best_location is not None:
             # 计算中心点（考虑缩放）
-            scaled_template = cv2.resize(template, None, fx=best_scale, fy=best_scale)
+            scaled_template = self._get_scaled_template(template, template_path, best_scale)
             template_h, template_w = scaled_template.shape[:2]
             center_x = best_location[0] + template_w // 2
             center_y = best_location[1] + template_h // 2
             
-            self.logger.info(f"多尺度匹配成功 (缩放: {best_scale:.2f}): {template_path}, 置信度: {best_confidence:.3f}, 位置: ({center_x}, {center_y})")
+            self.logger.info("多尺度匹配成功 (缩放: %.2f): %s, 置信度: %.3f, 位置: (%d, %d)", best_scale, template_path, best_confidence, center_x, center_y)
             
             # 调试模式下保存匹配结果
             if self.config_manager.get("debug_mode", False):
@@ -265,7 +1765,7 @@ class TemplateManager:
         return None
     
     def _enhanced_template_matching(self, screenshot: np.ndarray, template: np.ndarray, 
-                                   confidence: float) -> Optional[Tuple[int, int]]:
+                                   confidence: float, template_path: Optional[str] = None) -> Optional[Tuple[int, int]]:
         """
         增强的模板匹配，使用图像预处理技术
         
@@ -273,26 +1773,27 @@ class TemplateManager:
             screenshot: 屏幕截图
             template: 模板图像
             confidence: 置信度阈值
+            template_path: 模板路径（用于缓存模板的预处理结果）
             
         Returns:
             匹配位置的中心点坐标 (x, y) 或 None
         """
         try:
+            # 模板的预处理结果只计算一次
+            template_gray, template_blur, template_eq, template_edges = \
+                self._get_preprocessed_template(template, template_path)
+            
             # 转换为灰度图
-            screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+            screenshot_gray = screenshot if screenshot.ndim == 2 else cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
             
             # 应用高斯模糊减少噪声
             screenshot_blur = cv2.GaussianBlur(screenshot_gray, (3, 3), 0)
-            template_blur = cv2.GaussianBlur(template_gray, (3, 3), 0)
             
             # 直方图均衡化
             screenshot_eq = cv2.equalizeHist(screenshot_blur)
-            template_eq = cv2.equalizeHist(template_blur)
             
             # 边缘检测
             screenshot_edges = cv2.Canny(screenshot_eq, 50, 150)
-            template_edges = cv2.Canny(template_eq, 50, 150)
             
             # 在预处理后的图像上进行匹配
             preprocessing_methods = [
@@ -307,27 +1808,27 @@ class TemplateManager:
             best_template = None
             
             for screen_proc, temp_proc, method_name in preprocessing_methods:
-                result = cv2.matchTemplate(screen_proc, temp_proc, cv2.TM_CCOEFF_NORMED)
+                result = self._match(screen_proc, temp_proc)
                 _, max_val, _, max_loc = cv2.minMaxLoc(result)
                 
                 if max_val > best_confidence:
                     best_confidence = max_val
                     best_location = max_loc
                     best_template = temp_proc
-                    self.logger.debug(f"预处理方法 '{method_name}' 获得更好匹配: {max_val:.3f}")
+                    self.logger.debug("预处理方法 '%s' 获得更好匹配: %.3f", method_name, max_val)
             
             if best_confidence >= confidence and best_location is not None:
                 template_h, template_w = best_template.shape[:2]
                 center_x = best_location[0] + template_w // 2
                 center_y = best_location[1] + template_h // 2
                 
-                self.logger.info(f"增强匹配成功，置信度: {best_confidence:.3f}, 位置: ({center_x}, {center_y})")
+                self.logger.info("增强匹配成功，置信度: %.3f, 位置: (%d, %d)", best_confidence, center_x, center_y)
                 return (center_x, center_y)
             
             return None
             
         except Exception as e:
-            self.logger.error(f"增强模板匹配失败: {e}")
+            self.logger.error("增强模板匹配失败: %s", e)
             return None
     
     def _save_debug_match_result(self, screenshot: np.ndarray, template: np.ndarray, 
@@ -362,10 +1863,10 @@ class TemplateManager:
             debug_path = f"debug_match_{template_name}_{timestamp}.png"
             cv2.imwrite(debug_path, debug_img)
             
-            self.logger.debug(f"调试匹配结果已保存: {debug_path}")
+            self.logger.debug("调试匹配结果已保存: %s", debug_path)
             
         except Exception as e:
-            self.logger.error(f"保存调试匹配结果失败: {e}")
+            self.logger.error("保存调试匹配结果失败: %s", e)
     
     def analyze_template_quality(self, template_path: str) -> Dict[str, Any]:
         """
@@ -494,10 +1995,10 @@ class TemplateManager:
             if optimizations:
                 config_manager.set("template_optimizations", optimizations)
                 config_manager.save_config()
-                self.logger.info(f"已应用模板优化设置: {optimizations}")
+                self.logger.info("已应用模板优化设置: %s", optimizations)
             
         except Exception as e:
-            self.logger.error(f"优化模板匹配设置失败: {e}")
+            self.logger.error("优化模板匹配设置失败: %s", e)
     
     def save_template_from_selection(self, name: str, region: Tuple[int, int, int, int]):
         """
@@ -511,8 +2012,8 @@ class TemplateManager:
             screenshot = pyautogui.screenshot(region=region)
             template_path = self.templates_dir / f"{name}.png"
             screenshot.save(template_path)
-            self.logger.info(f"模板已保存: {template_path}")
+            self.logger.info("模板已保存: %s", template_path)
             return str(template_path)
         except Exception as e:
-            self.logger.error(f"保存模板失败: {e}")
+            self.logger.error("保存模板失败: %s", e)
             return None
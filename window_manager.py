@@ -37,7 +37,7 @@ class WindowManager:
             
             # 获取所有窗口标题
             all_titles = gw.getAllTitles()
-            print(all_titles)
+            self.logger.debug("所有窗口标题: %s", all_titles)
             window_title = self.config_manager.get("window_title", "Spine")
             spine_windows = [title for title in all_titles if window_title in title]
             